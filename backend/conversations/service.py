@@ -1,6 +1,7 @@
-import json
+import orjson
 from typing import List, Dict, Optional
 from backend.db.connection import get_central_db
+from backend.config import CHAT_HISTORY_MAX_CHARS
 
 
 class ConversationService:
@@ -42,13 +43,14 @@ class ConversationService:
     ):
         db = await get_central_db()
         try:
+            # Insert and touch the conversation in one atomic round trip
             await db.execute(
-                "INSERT INTO messages (conversation_id, role, content, sources_json) VALUES ($1, $2, $3, $4)",
-                conversation_id, role, content, json.dumps(sources) if sources else None,
-            )
-            await db.execute(
-                "UPDATE conversations SET updated_at = NOW() WHERE id = $1 AND user_id = $2",
-                conversation_id, user_id,
+                """WITH msg AS (
+                       INSERT INTO messages (conversation_id, role, content, sources_json)
+                       VALUES ($1, $2, $3, $4)
+                   )
+                   UPDATE conversations SET updated_at = NOW() WHERE id = $1 AND user_id = $5""",
+                conversation_id, role, content, orjson.dumps(sources).decode() if sources else None, user_id,
             )
         finally:
             await db.close()
@@ -65,7 +67,7 @@ class ConversationService:
             messages = []
             for row in rows:
                 msg = dict(row)
-                msg["sources"] = json.loads(msg.pop("sources_json")) if msg.get("sources_json") else []
+                msg["sources"] = orjson.loads(msg.pop("sources_json")) if msg.get("sources_json") else []
                 msg["created_at"] = str(msg["created_at"])
                 messages.append(msg)
             return messages
@@ -74,15 +76,22 @@ class ConversationService:
 
     @staticmethod
     async def get_recent_history(conversation_id: int, limit: int = 10, user_id: Optional[int] = None) -> List[Dict[str, str]]:
-        """Get recent messages formatted for chat_history parameter."""
+        """Get recent messages formatted for chat_history parameter.
+
+        Long messages are truncated in SQL, as the router would truncate them,
+        so full answers never leave the database.
+        """
         db = await get_central_db()
         try:
             rows = await db.fetch_all(
-                "SELECT role, content FROM messages "
+                "SELECT role, LEFT(content, $3) AS content, LENGTH(content) > $3 AS truncated FROM messages "
                 "WHERE conversation_id = $1 ORDER BY created_at DESC LIMIT $2",
-                conversation_id, limit,
+                conversation_id, limit, CHAT_HISTORY_MAX_CHARS,
             )
-            return [{"role": r["role"], "content": r["content"]} for r in reversed(rows)]
+            return [
+                {"role": r["role"], "content": r["content"] + "..." if r["truncated"] else r["content"]}
+                for r in reversed(rows)
+            ]
         finally:
             await db.close()
 
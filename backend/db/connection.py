@@ -5,7 +5,9 @@ from typing import Optional
 
 import asyncpg
 
-from backend.config import DATABASE_URL
+from backend.config import (
+    DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_STATEMENT_CACHE_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +58,10 @@ class Database:
         row = await self._conn.fetchrow(query, *args)
         return dict(row) if row else None
 
+    async def fetch_value(self, query: str, *args):
+        """Fetch the first column of the first row, or None."""
+        return await self._conn.fetchval(query, *args)
+
     async def fetch_all(self, query: str, *args) -> list[dict]:
         """Fetch all rows as a list of dicts."""
         rows = await self._conn.fetch(query, *args)
@@ -88,7 +94,12 @@ async def init_central_pool() -> None:
             "Set it to your Supabase PostgreSQL connection string."
         )
     _pool = await asyncpg.create_pool(
-        DATABASE_URL, min_size=3, max_size=10, command_timeout=30
+        DATABASE_URL,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        command_timeout=30,
+        # Queries are fixed strings, so each is parsed and planned once per connection
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
     )
     logger.info("DB pool created")
 
@@ -18,8 +18,10 @@ CREATE TABLE IF NOT EXISTS projects (
     updated_at TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(user_id, slug)
 );
-CREATE INDEX IF NOT EXISTS idx_projects_user ON projects(user_id);
-CREATE INDEX IF NOT EXISTS idx_projects_slug ON projects(slug);
+-- UNIQUE(user_id, slug) serves slug lookups; this one serves the newest-first listing
+CREATE INDEX IF NOT EXISTS idx_projects_user_updated ON projects(user_id, updated_at DESC);
+DROP INDEX IF EXISTS idx_projects_user;
+DROP INDEX IF EXISTS idx_projects_slug;
 
 CREATE TABLE IF NOT EXISTS documents (
     id SERIAL PRIMARY KEY,
@@ -33,6 +35,29 @@ CREATE TABLE IF NOT EXISTS documents (
 );
 CREATE INDEX IF NOT EXISTS idx_documents_user ON documents(user_id);
 CREATE INDEX IF NOT EXISTS idx_documents_project ON documents(project_id);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunk_count INTEGER;
+CREATE INDEX IF NOT EXISTS idx_documents_hash ON documents(user_id, content_hash);
+
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    project_id INTEGER REFERENCES projects(id) ON DELETE SET NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    detail TEXT,
+    document_id INTEGER REFERENCES documents(id) ON DELETE SET NULL,
+    chunks_created INTEGER,
+    content_hash TEXT,
+    owner TEXT,  -- instance running the job; it refreshes updated_at as a heartbeat
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_upload_jobs_user ON upload_jobs(user_id);
+-- At most one in-flight job per file, so a retried upload joins the running job
+CREATE UNIQUE INDEX IF NOT EXISTS idx_upload_jobs_inflight
+    ON upload_jobs(user_id, COALESCE(project_id, 0), content_hash)
+    WHERE status IN ('queued', 'processing');
 
 CREATE TABLE IF NOT EXISTS conversations (
     id SERIAL PRIMARY KEY,
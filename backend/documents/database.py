@@ -11,15 +11,19 @@ async def insert_document(
     mime_type: str,
     user_id: int,
     project_id: Optional[int] = None,
+    content_hash: Optional[str] = None,
+    chunk_count: Optional[int] = None,
 ) -> int:
     """Insert a document record. Returns the document ID."""
     db = await get_central_db()
     try:
         result = await db.execute(
             """INSERT INTO documents
-               (user_id, filename, extension, size_bytes, mime_type, project_id)
-               VALUES ($1, $2, $3, $4, $5, $6)""",
+               (user_id, filename, extension, size_bytes, mime_type, project_id,
+                content_hash, chunk_count)
+               VALUES ($1, $2, $3, $4, $5, $6, $7, $8)""",
             user_id, filename, extension, size_bytes, mime_type, project_id,
+            content_hash, chunk_count,
         )
         return result.lastrowid
     finally:
@@ -31,7 +35,9 @@ async def get_document_by_id(doc_id: int, user_id: int) -> Optional[Dict[str, An
     db = await get_central_db()
     try:
         row = await db.fetch_one(
-            "SELECT * FROM documents WHERE id = $1 AND user_id = $2", doc_id, user_id
+            """SELECT id, filename, extension, size_bytes, mime_type, project_id, created_at
+               FROM documents WHERE id = $1 AND user_id = $2""",
+            doc_id, user_id,
         )
         if not row:
             return None
@@ -48,6 +54,29 @@ async def get_document_by_id(doc_id: int, user_id: int) -> Optional[Dict[str, An
         await db.close()
 
 
+async def get_document_by_hash(
+    content_hash: str, user_id: int, project_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Find an already-ingested document with the same content in the same project."""
+    db = await get_central_db()
+    try:
+        row = await db.fetch_one(
+            """SELECT id, filename, chunk_count FROM documents
+               WHERE user_id = $1 AND content_hash = $2 AND project_id IS NOT DISTINCT FROM $3
+               ORDER BY created_at DESC LIMIT 1""",
+            user_id, content_hash, project_id,
+        )
+        if not row:
+            return None
+        return {
+            "id": row["id"],
+            "filename": row["filename"],
+            "chunk_count": row["chunk_count"] or 0,
+        }
+    finally:
+        await db.close()
+
+
 async def get_documents_by_project(project_id: int, user_id: int) -> List[Dict[str, Any]]:
     """Get all documents for a project."""
     db = await get_central_db()
@@ -77,3 +106,15 @@ async def delete_document(doc_id: int, user_id: int) -> Optional[Dict[str, Any]]
         return doc
     finally:
         await db.close()
+
+
+async def delete_documents_by_filename(filename: str, user_id: int) -> int:
+    """Delete every document record for a source name. Returns the number deleted."""
+    db = await get_central_db()
+    try:
+        result = await db.execute(
+            "DELETE FROM documents WHERE filename = $1 AND user_id = $2", filename, user_id
+        )
+        return result.rowcount
+    finally:
+        await db.close()
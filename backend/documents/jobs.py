@@ -0,0 +1,145 @@
+"""PostgreSQL CRUD operations for the upload_jobs table."""
+
+import uuid
+from typing import Optional, Dict, Any, Tuple
+from backend.db.connection import get_central_db
+from backend.config import JOB_STALE_AFTER
+
+# Job lifecycle: queued -> processing -> done | failed
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Identifies this process as the owner of the jobs it runs
+INSTANCE_ID = uuid.uuid4().hex
+
+_LOST_JOB_DETAIL = "Server restarted before processing finished. Please upload again."
+
+
+async def create_job(
+    filename: str,
+    user_id: int,
+    project_id: Optional[int] = None,
+    content_hash: Optional[str] = None,
+) -> Tuple[int, str, bool]:
+    """Queue an upload job, or join the in-flight job for the same file.
+
+    The unique in-flight index makes the claim atomic across requests and
+    instances. Returns (job ID, its status, whether this call created it).
+    """
+    db = await get_central_db()
+    try:
+        while True:
+            row = await db.fetch_one(
+                """INSERT INTO upload_jobs (user_id, filename, project_id, status, content_hash, owner)
+                   VALUES ($1, $2, $3, $4, $5, $6)
+                   ON CONFLICT DO NOTHING
+                   RETURNING id""",
+                user_id, filename, project_id, JOB_QUEUED, content_hash, INSTANCE_ID,
+            )
+            if row:
+                return row["id"], JOB_QUEUED, True
+
+            row = await db.fetch_one(
+                """SELECT id, status, updated_at < NOW() - make_interval(secs => $6) AS stale
+                   FROM upload_jobs
+                   WHERE user_id = $1 AND project_id IS NOT DISTINCT FROM $2
+                     AND content_hash = $3 AND status IN ($4, $5)""",
+                user_id, project_id, content_hash, JOB_QUEUED, JOB_PROCESSING, JOB_STALE_AFTER,
+            )
+            if row and not row["stale"]:
+                return row["id"], row["status"], False
+            if row:
+                # Its instance is gone; release the claim before taking it
+                await update_job(row["id"], JOB_FAILED, detail=_LOST_JOB_DETAIL)
+            # Otherwise the other job finished between the two statements; claim again
+    finally:
+        await db.close()
+
+
+async def update_job(
+    job_id: int,
+    status: str,
+    detail: Optional[str] = None,
+    document_id: Optional[int] = None,
+    chunks_created: Optional[int] = None,
+) -> bool:
+    """Record a status transition for a job.
+
+    Finished jobs (done or failed) are never changed again. Returns False if
+    the job had already finished, e.g. it was failed as stale.
+    """
+    db = await get_central_db()
+    try:
+        result = await db.execute(
+            """UPDATE upload_jobs
+               SET status = $2, detail = $3, document_id = $4, chunks_created = $5,
+                   updated_at = NOW()
+               WHERE id = $1 AND status NOT IN ($6, $7)""",
+            job_id, status, detail, document_id, chunks_created, JOB_DONE, JOB_FAILED,
+        )
+        return result.rowcount > 0
+    finally:
+        await db.close()
+
+
+async def get_job(job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Get a job by ID."""
+    db = await get_central_db()
+    try:
+        row = await db.fetch_one(
+            "SELECT * FROM upload_jobs WHERE id = $1 AND user_id = $2", job_id, user_id
+        )
+        if not row:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "source": row["filename"],
+            "project_id": row["project_id"],
+            "detail": row["detail"],
+            "document_id": row["document_id"],
+            "chunks_created": row["chunks_created"],
+            "created_at": str(row["created_at"]),
+            "updated_at": str(row["updated_at"]),
+        }
+    finally:
+        await db.close()
+
+
+async def heartbeat_jobs() -> int:
+    """Refresh updated_at on this instance's unfinished jobs. Returns the number touched."""
+    db = await get_central_db()
+    try:
+        result = await db.execute(
+            """UPDATE upload_jobs SET updated_at = NOW()
+               WHERE owner = $1 AND status IN ($2, $3)""",
+            INSTANCE_ID, JOB_QUEUED, JOB_PROCESSING,
+        )
+        return result.rowcount
+    finally:
+        await db.close()
+
+
+async def fail_stale_jobs() -> int:
+    """Mark unfinished jobs whose instance stopped heartbeating as failed.
+
+    Jobs run in-process on the instance that accepted the upload, and other
+    instances may be running theirs, so only jobs silent for JOB_STALE_AFTER
+    seconds are failed. Returns the number of jobs updated.
+    """
+    db = await get_central_db()
+    try:
+        result = await db.execute(
+            """UPDATE upload_jobs
+               SET status = $1, detail = $2, updated_at = NOW()
+               WHERE status IN ($3, $4)
+                 AND updated_at < NOW() - make_interval(secs => $5)
+                 AND owner IS DISTINCT FROM $6""",
+            JOB_FAILED, _LOST_JOB_DETAIL, JOB_QUEUED, JOB_PROCESSING,
+            JOB_STALE_AFTER, INSTANCE_ID,
+        )
+        return result.rowcount
+    finally:
+        await db.close()
@@ -0,0 +1,87 @@
+"""Shared HTTP clients for external APIs.
+
+One keep-alive (HTTP/2) connection pool is reused by every Cohere and Groq
+client, plus an async pool for Groq's async calls, so requests skip the
+DNS + TLS handshake after the first call.
+"""
+
+from typing import Optional
+
+import cohere
+import httpx
+
+from backend.config import (
+    API_TIMEOUT, COHERE_API_KEY,
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY,
+)
+
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_cohere_client: Optional[cohere.Client] = None
+_cohere_client_v2: Optional[cohere.ClientV2] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Get the process-wide pooled HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(http2=True, timeout=API_TIMEOUT, limits=_limits())
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the process-wide pooled async HTTP client, creating it on first use."""
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(http2=True, timeout=API_TIMEOUT, limits=_limits())
+    return _async_http_client
+
+
+def groq_client_kwargs() -> dict:
+    """ChatGroq keyword arguments that route its sync and async calls through the shared pools."""
+    return {"http_client": get_http_client(), "http_async_client": get_async_http_client()}
+
+
+def get_cohere_client() -> cohere.Client:
+    """Cohere v1 client (embeddings) backed by the shared connection pool."""
+    global _cohere_client
+    if _cohere_client is None:
+        _cohere_client = cohere.Client(
+            api_key=COHERE_API_KEY,
+            timeout=API_TIMEOUT,
+            httpx_client=get_http_client(),
+        )
+    return _cohere_client
+
+
+def get_cohere_client_v2() -> cohere.ClientV2:
+    """Cohere v2 client (rerank) backed by the shared connection pool."""
+    global _cohere_client_v2
+    if _cohere_client_v2 is None:
+        _cohere_client_v2 = cohere.ClientV2(
+            api_key=COHERE_API_KEY,
+            timeout=API_TIMEOUT,
+            httpx_client=get_http_client(),
+        )
+    return _cohere_client_v2
+
+
+async def close_http_clients() -> None:
+    """Close the shared connection pools. Called at app shutdown."""
+    global _http_client, _async_http_client, _cohere_client, _cohere_client_v2
+    if _http_client is not None:
+        _http_client.close()
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+    _http_client = None
+    _async_http_client = None
+    _cohere_client = None
+    _cohere_client_v2 = None
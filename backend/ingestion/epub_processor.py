@@ -1,6 +1,10 @@
+import asyncio
+import io
 import re
+import shutil
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, BinaryIO, Tuple
 import tempfile
 
 try:
@@ -16,6 +20,14 @@ try:
 except ImportError:
     BS4_AVAILABLE = False
 
+# Parse chapter HTML with lxml's C parser (installed with ebooklib) rather than
+# the pure-Python html.parser; keep html.parser as a fallback
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # Noise item patterns (case-insensitive)
 _NOISE_PATTERNS = re.compile(
     r"(cover|toc|nav|copyright|titlepage|halftitle|colophon|frontmatter)",
@@ -25,6 +37,9 @@ _NOISE_PATTERNS = re.compile(
 # Heading tags to track
 _HEADING_TAGS = {"h1", "h2", "h3"}
 
+# Max chapters queued on the executor at once in process_file_parallel()
+EPUB_MAX_IN_FLIGHT = 32
+
 
 class EPUBProcessor:
     """Process EPUB ebook files with structure-aware extraction."""
@@ -39,15 +54,15 @@ class EPUBProcessor:
                 "beautifulsoup4 is not installed. Install with: pip install beautifulsoup4"
             )
 
-    def _is_noise_item(self, item, text: str) -> bool:
+    def _is_noise_item(self, item_id: Optional[str], item_name: Optional[str], text: str) -> bool:
         """Check if an EPUB item is noise (cover, TOC, copyright, etc.)."""
         # Too little text content
         if len(text.strip()) < 50:
             return True
 
         # ID or filename matches noise patterns
-        item_id = (item.get_id() or "").lower()
-        item_name = (item.get_name() or "").lower()
+        item_id = (item_id or "").lower()
+        item_name = (item_name or "").lower()
         if _NOISE_PATTERNS.search(item_id) or _NOISE_PATTERNS.search(item_name):
             return True
 
@@ -80,7 +95,7 @@ class EPUBProcessor:
         - heading_level: 1/2/3 (or None)
         - heading_hierarchy: list of heading strings from h1 down
         """
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = BeautifulSoup(html_content, HTML_PARSER)
 
         # Remove non-content elements
         for element in soup(["script", "style", "nav", "header", "footer"]):
@@ -166,16 +181,16 @@ class EPUBProcessor:
 
         return sections
 
-    def _process_book(self, book, filename: str) -> List[Dict[str, Any]]:
-        """Core processing logic shared by process() and process_bytes()."""
-        documents = []
-        chapter_num = 0
+    def _read_spine(self, book) -> Tuple[Optional[str], List[Tuple[str, str, bytes]]]:
+        """
+        Read the book title and the raw content of each linear spine item.
 
-        # Get book title from metadata
+        Returns (title or None, [(item_id, item_name, content), ...]) in reading order.
+        """
         title = book.get_metadata("DC", "title")
-        book_title = title[0][0] if title else Path(filename).stem
+        book_title = title[0][0] if title else None
 
-        # Use spine for correct reading order
+        items = []
         for item_id, linear in book.spine:
             if linear == "no":
                 continue
@@ -184,9 +199,44 @@ class EPUBProcessor:
             if item is None:
                 continue
 
-            content = item.get_content()
-            sections = self._extract_sections(content)
+            items.append((item.get_id(), item.get_name(), item.get_content()))
+
+        return book_title, items
+
+    def read_chapters(self, file_path: str | Path) -> Tuple[Optional[str], List[Tuple[str, str, bytes]]]:
+        """Read an EPUB on disk into (title, spine items) for per-chapter extraction."""
+        return self._read_spine(epub.read_epub(str(file_path)))
+
+    def extract_chapter(self, item_id: str, item_name: str, content: bytes) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Extract the sections of one spine item.
+
+        Chapters are independent, so this can run in parallel across items.
+
+        Returns:
+            (sections, is_noise). Items with no sections do not count as chapters;
+            noise items count toward chapter numbering but are not indexed.
+        """
+        sections = self._extract_sections(content)
+        if not sections:
+            return [], False
+
+        # Check noise after extraction (uses full text of item)
+        full_text = "\n".join(s["text"] for s in sections)
+        return sections, self._is_noise_item(item_id, item_name, full_text)
+
+    def _build_documents(
+        self,
+        chapters: List[Tuple[str, List[Dict[str, Any]], bool]],
+        book_title: Optional[str],
+        filename: str,
+    ) -> List[Dict[str, Any]]:
+        """Turn extracted (item_id, sections, is_noise) chapters, in spine order, into documents."""
+        documents = []
+        chapter_num = 0
+        book_title = book_title or Path(filename).stem
 
+        for item_id, sections, is_noise in chapters:
             if not sections:
                 continue
 
@@ -199,9 +249,7 @@ class EPUBProcessor:
 
             chapter_num += 1
 
-            # Check noise after extraction (uses full text of item)
-            full_text = "\n".join(s["text"] for s in sections)
-            if self._is_noise_item(item, full_text):
+            if is_noise:
                 continue
 
             for section in sections:
@@ -210,7 +258,7 @@ class EPUBProcessor:
                     "source": filename,
                     "source_type": "epub",
                     "chapter": chapter_num,
-                    "chapter_id": item.get_id(),
+                    "chapter_id": item_id,
                     "chapter_title": chapter_title,
                     "section_title": section["heading"],
                     "heading_level": section["heading_level"],
@@ -221,6 +269,43 @@ class EPUBProcessor:
 
         return documents
 
+    def _process_book(self, book, filename: str) -> List[Dict[str, Any]]:
+        """Core processing logic shared by process() and process_file()."""
+        book_title, items = self._read_spine(book)
+        chapters = [
+            (item_id, *self.extract_chapter(item_id, item_name, content))
+            for item_id, item_name, content in items
+        ]
+        return self._build_documents(chapters, book_title, filename)
+
+    async def process_file_parallel(
+        self,
+        file_path: str | Path,
+        filename: str,
+        executor: Executor,
+        max_in_flight: int = EPUB_MAX_IN_FLIGHT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process an EPUB on disk, extracting chapters concurrently on executor.
+
+        At most max_in_flight chapters are queued at once to bound memory;
+        results are reassembled in spine order so output matches process_file().
+        """
+        loop = asyncio.get_running_loop()
+        book_title, items = await loop.run_in_executor(executor, self.read_chapters, file_path)
+
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def _extract(item_id: str, item_name: str, content: bytes):
+            async with semaphore:
+                sections, is_noise = await loop.run_in_executor(
+                    executor, self.extract_chapter, item_id, item_name, content
+                )
+            return item_id, sections, is_noise
+
+        chapters = await asyncio.gather(*(_extract(*item) for item in items))
+        return self._build_documents(chapters, book_title, filename)
+
     def process(self, file_path: str | Path) -> List[Dict[str, Any]]:
         """
         Extract structured text from an EPUB file.
@@ -246,19 +331,45 @@ class EPUBProcessor:
             content: EPUB file content as bytes
             filename: Original filename
 
+        Returns:
+            List of dicts with 'text' and metadata (one per section)
+        """
+        return self.process_stream(io.BytesIO(content), filename)
+
+    def process_stream(self, stream: BinaryIO, filename: str) -> List[Dict[str, Any]]:
+        """
+        Process EPUB from a binary file object (for streamed uploads).
+
+        Args:
+            stream: Readable binary file object positioned at the start of the EPUB
+            filename: Original filename
+
         Returns:
             List of dicts with 'text' and metadata (one per section)
         """
         with tempfile.NamedTemporaryFile(suffix=".epub", delete=False) as tmp:
-            tmp.write(content)
+            shutil.copyfileobj(stream, tmp)
             tmp_path = tmp.name
 
         try:
-            book = epub.read_epub(tmp_path)
-            return self._process_book(book, filename)
+            return self.process_file(tmp_path, filename)
         finally:
             Path(tmp_path).unlink(missing_ok=True)
 
+    def process_file(self, file_path: str | Path, filename: str) -> List[Dict[str, Any]]:
+        """
+        Process an EPUB that is already on disk (for uploads spooled to a temp file).
+
+        Args:
+            file_path: Path to the EPUB file
+            filename: Original filename to record as the source
+
+        Returns:
+            List of dicts with 'text' and metadata (one per section)
+        """
+        book = epub.read_epub(str(file_path))
+        return self._process_book(book, filename)
+
 
 def is_ebooklib_available() -> bool:
     """Check if ebooklib is available."""
@@ -0,0 +1,61 @@
+"""Framework-independent helpers for the document upload endpoint."""
+
+import hashlib
+import mmap
+import os
+from typing import Dict
+
+# Max bytes per sendfile() call when copying uploads between files
+SENDFILE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Supported file extensions and their processors
+SUPPORTED_EXTENSIONS: Dict[str, str] = {
+    ".epub": "epub",
+}
+
+# Membership checks on the upload path use the frozenset; the dict is kept for dispatch
+SUPPORTED_EXTENSION_SET = frozenset(SUPPORTED_EXTENSIONS)
+
+MIME_TYPES: Dict[str, str] = {
+    ".epub": "application/epub+zip",
+}
+
+
+def get_extension(filename: str) -> str:
+    """Return the lowercased extension of filename (with the dot), or ""."""
+    return os.path.splitext(filename)[1].lower()
+
+
+def get_mime_type(ext: str) -> str:
+    """Return the MIME type stored for an extension."""
+    return MIME_TYPES.get(ext, "application/octet-stream")
+
+
+def describe_storage_error(e: Exception) -> str:
+    """Turn a vector store failure into a user-facing error message."""
+    error_msg = str(e).lower()
+    if "api" in error_msg or "key" in error_msg or "unauthorized" in error_msg:
+        return "Vector database authentication failed. Check your PINECONE_API_KEY and COHERE_API_KEY."
+    if "timeout" in error_msg or "connection" in error_msg:
+        return "Could not connect to vector database. Check your internet connection and try again."
+    if "quota" in error_msg or "limit" in error_msg or "rate" in error_msg:
+        return "API rate limit reached. Wait a moment and try uploading a smaller file."
+    return f"Failed to store document: {str(e)}"
+
+
+def copy_fd(src_fd: int, dst_fd: int) -> int:
+    """Copy a whole file to another inside the kernel with sendfile(). Returns bytes copied."""
+    offset = 0
+    while True:
+        sent = os.sendfile(dst_fd, src_fd, offset, SENDFILE_CHUNK_SIZE)
+        if sent == 0:
+            return offset
+        offset += sent
+
+
+def sha256_fd(fd: int, size: int) -> str:
+    """Hash the first size bytes of a file through an mmap, without copying it into Python."""
+    if size == 0:
+        return hashlib.sha256().hexdigest()
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapped:
+        return hashlib.sha256(mapped).hexdigest()
@@ -0,0 +1,28 @@
+"""Process-pool entry points for CPU-bound ingestion work.
+
+These functions run inside worker processes, so they only take and return
+picklable values and build their own chunker on first use in each process.
+"""
+
+from typing import List, Dict, Any
+
+from backend.config import CHUNKING_METHOD
+from backend.ingestion.chunker import Chunker
+from backend.ingestion.recursive_chunker import RecursiveChunker
+
+_chunker = None
+
+
+def create_chunker():
+    """Create the chunker selected by CHUNKING_METHOD."""
+    if CHUNKING_METHOD == "recursive":
+        return RecursiveChunker()
+    return Chunker()
+
+
+def chunk_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chunk extracted documents with this process's chunker."""
+    global _chunker
+    if _chunker is None:
+        _chunker = create_chunker()
+    return _chunker.chunk_documents(documents)
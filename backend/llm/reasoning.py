@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional, AsyncGenerator
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from langsmith import traceable
+from backend.http_clients import groq_client_kwargs
 from backend.config import (
     GROQ_API_KEY, GROQ_MODEL,
     SYSTEM_PROMPT,
@@ -19,6 +20,7 @@ class LLMReasoning:
             api_key=key,
             temperature=LLM_TEMPERATURE,
             max_tokens=LLM_MAX_TOKENS,
+            **groq_client_kwargs(),
         ) if key else None
 
     def _format_context(self, chunks: List[Dict[str, Any]]) -> str:
@@ -1,36 +1,58 @@
+import io
 import os
-import json
+import asyncio
+import multiprocessing
+import hashlib
+import tempfile
 import time
 import logging
+import threading
+import orjson
 import uvicorn
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List
-
-from backend.ingestion import (
-    Chunker, RecursiveChunker,
-    EPUBProcessor, is_ebooklib_available,
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, BinaryIO, Union
+
+from backend.ingestion import Chunker, RecursiveChunker, EPUBProcessor, is_ebooklib_available
+from backend.ingestion import workers as ingest_workers
+from backend.ingestion.upload import (
+    SUPPORTED_EXTENSIONS, SUPPORTED_EXTENSION_SET, get_extension, get_mime_type, describe_storage_error,
+    copy_fd, sha256_fd,
 )
-from backend.storage import VectorStore
+from backend.storage import VectorStore, VectorWriteBatcher
 from backend.retrieval import QueryEngine
 from backend.config import (
     MAX_UPLOAD_SIZE, MAX_UPLOAD_SIZE_MB, ENABLE_QUERY_ROUTING,
-    CHUNKING_METHOD, UPLOADS_DIR
+    UPLOADS_DIR, UPLOAD_READ_CHUNK_SIZE, INGEST_WORKERS, UPLOAD_JOB_CONCURRENCY,
+    JOB_HEARTBEAT_INTERVAL,
+    INGEST_PIPELINE_DOCS,
 )
 from backend.routing import QueryRouter, RouteHandlers
+from backend.routing.query_router import RouteType
 from backend.auth import get_current_user
 from backend.auth.database import init_db, get_db
 from backend.db.connection import close_pools, get_central_db
+from backend.http_clients import close_http_clients
+from backend.sse import sse_event, SSE_THINKING
 from backend.projects.database import insert_project as _create_default_project
+from backend.documents import database as documents_db
+from backend.documents.jobs import (
+    create_job, update_job, get_job, heartbeat_jobs, fail_stale_jobs,
+    JOB_PROCESSING, JOB_DONE, JOB_FAILED,
+)
 from backend.conversations import ConversationService
 from backend.projects import projects_router
 
 app = FastAPI(
     title="Personal Knowledge Base API",
     description="RAG system for querying personal content",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes list-of-dict responses (sources, chunks) far faster
+    default_response_class=ORJSONResponse,
 )
 
 # CORS for frontend
@@ -56,6 +78,8 @@ app.include_router(projects_router)
 
 @app.on_event("startup")
 async def startup():
+    global ingest_executor, _warm_up_task, _job_heartbeat_task
+
     # Enable LangSmith tracing if configured
     from backend.config import LANGSMITH_TRACING, LANGSMITH_API_KEY, LANGSMITH_PROJECT
     if LANGSMITH_TRACING and LANGSMITH_API_KEY:
@@ -65,6 +89,17 @@ async def startup():
         os.environ["LANGCHAIN_ENDPOINT"] = "https://api.smith.langchain.com"
 
     os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+    # CPU-bound ingestion runs in separate processes so uploads don't block the event loop.
+    # spawn (not fork) keeps the workers clear of the parent's threads and open sockets.
+    ingest_executor = ProcessPoolExecutor(
+        max_workers=INGEST_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+    # Don't block startup (health checks) on external API clients
+    _warm_up_task = asyncio.create_task(warm_up_components())
+
     await init_db()
     # Ensure demo user exists for portfolio demo mode
     db = await get_db()
@@ -84,66 +119,178 @@ async def startup():
     finally:
         await db.close()
 
+    # Jobs run in-process; fail those whose instance stopped heartbeating
+    await fail_stale_jobs()
+    _job_heartbeat_task = asyncio.create_task(_job_heartbeat())
+
 
 @app.on_event("shutdown")
 async def shutdown():
+    if _job_heartbeat_task is not None:
+        _job_heartbeat_task.cancel()
+    # Interrupted jobs stop heartbeating and are failed by another instance's
+    # sweep; this just removes their temp files
+    for task in list(upload_jobs):
+        task.cancel()
+    await asyncio.gather(*upload_jobs, return_exceptions=True)
+    if vector_writer is not None:
+        await vector_writer.close()
     await close_pools()
+    if ingest_executor is not None:
+        ingest_executor.shutdown(wait=False, cancel_futures=True)
+    await close_http_clients()
 
 
 
 
-# Lazy-load heavy components to speed up startup
+# Heavy components: warmed up in the background at startup, and lazily
+# (re)built by get_components() if that hasn't finished or failed
 epub_processor = None
 chunker = None
 vector_store = None
+vector_writer = None
 query_engine = None
 query_router = None
 route_handlers = None
+ingest_executor = None
+_warm_up_task = None
+_job_heartbeat_task = None
+
+
+@dataclass(frozen=True)
+class Components:
+    """Fully built components, as handed to request handlers."""
+    epub: Optional[EPUBProcessor]
+    chunker: Union[Chunker, RecursiveChunker]
+    vector_store: VectorStore
+    vector_writer: VectorWriteBatcher
+    query_engine: QueryEngine
+    query_router: Optional[QueryRouter]
+    route_handlers: Optional[RouteHandlers]
+
+
+# Set once get_components() has built everything
+_components: Optional[Components] = None
+# Serializes builds, which run on worker threads, so components aren't built twice
+_components_lock = threading.Lock()
+
+# In-flight upload jobs, and the cap on how many ingest at once
+upload_jobs = set()
+upload_job_slots = asyncio.Semaphore(UPLOAD_JOB_CONCURRENCY)
+
+# Optional processor dependencies don't change at runtime; check them once
+EPUB_AVAILABLE = is_ebooklib_available()
+
+# Extension -> bound async process_file_parallel(path, filename, executor),
+# filled in as processors load
+processor_by_ext = {}
+
+
+def get_components() -> Components:
+    global epub_processor, _components
+    global chunker, vector_store, vector_writer, query_engine, query_router, route_handlers
+
+    # Everything built: skip the per-component checks
+    if _components is not None:
+        return _components
+
+    with _components_lock:
+        # Another thread may have finished the build while we waited
+        if _components is not None:
+            return _components
+
+        # Initialize EPUB processor and chunker
+        if chunker is None:
+            chunker = ingest_workers.create_chunker()
+        if epub_processor is None:
+            if EPUB_AVAILABLE:
+                epub_processor = EPUBProcessor()
+                processor_by_ext[".epub"] = epub_processor.process_file_parallel
+
+        # Initialize vector store and query engine (require API keys)
+        # Check separately so a failed init can be retried
+        if vector_store is None:
+            try:
+                vector_store = VectorStore()
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Vector store initialization failed: {str(e)}"
+                )
+
+        if vector_writer is None:
+            vector_writer = VectorWriteBatcher(vector_store)
+
+        if query_engine is None:
+            query_engine = QueryEngine(vector_store=vector_store)
+
+        # Initialize query router and handlers (if routing is enabled)
+        if ENABLE_QUERY_ROUTING:
+            if query_router is None:
+                query_router = QueryRouter()
+            if route_handlers is None:
+                route_handlers = RouteHandlers(
+                    vector_store=vector_store,
+                    query_engine=query_engine
+                )
+
+        _components = Components(
+            epub=epub_processor,
+            chunker=chunker,
+            vector_store=vector_store,
+            vector_writer=vector_writer,
+            query_engine=query_engine,
+            query_router=query_router,
+            route_handlers=route_handlers,
+        )
+        return _components
 
 
-def get_components():
-    global epub_processor
-    global chunker, vector_store, query_engine, query_router, route_handlers
+async def require_components() -> Components:
+    """FastAPI dependency: the shared components, built off the event loop on first use."""
+    if _components is not None:
+        return _components
+    return await asyncio.to_thread(get_components)
 
-    # Initialize EPUB processor and chunker
-    if epub_processor is None:
-        if CHUNKING_METHOD == "recursive":
-            chunker = RecursiveChunker()
-        else:
-            chunker = Chunker()
-        if is_ebooklib_available():
-            epub_processor = EPUBProcessor()
 
-    # Initialize vector store and query engine (require API keys)
-    # Check separately so a failed init can be retried
-    if vector_store is None:
-        try:
-            vector_store = VectorStore()
-        except ValueError as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"Vector store initialization failed: {str(e)}"
-            )
+async def warm_up_components():
+    """
+    Build components in the background at startup so the first request
+    doesn't pay for client setup and tokenizer loading.
 
-    if query_engine is None:
-        query_engine = QueryEngine(vector_store=vector_store)
+    Independent components are constructed concurrently in threads; the
+    dependent ones are then filled in by get_components(). Failures are
+    only logged: get_components() retries lazily on the next request.
+    """
+    global chunker, vector_store, query_router
 
-    # Initialize query router and handlers (if routing is enabled)
-    if query_router is None and ENABLE_QUERY_ROUTING:
-        query_router = QueryRouter()
-        route_handlers = RouteHandlers(
-            vector_store=vector_store,
-            query_engine=query_engine
-        )
+    factories = {"chunker": ingest_workers.create_chunker, "vector_store": VectorStore}
+    if ENABLE_QUERY_ROUTING:
+        factories["query_router"] = QueryRouter
 
-    return {
-        "epub": epub_processor,
-        "chunker": chunker,
-        "vector_store": vector_store,
-        "query_engine": query_engine,
-        "query_router": query_router,
-        "route_handlers": route_handlers,
-    }
+    results = await asyncio.gather(
+        *(asyncio.to_thread(factory) for factory in factories.values()),
+        return_exceptions=True,
+    )
+    built = {}
+    for name, result in zip(factories, results):
+        if isinstance(result, Exception):
+            logging.warning("Startup warm-up of %s failed: %s", name, result)
+        else:
+            built[name] = result
+
+    # Keep anything a concurrent request already built
+    if chunker is None:
+        chunker = built.get("chunker")
+    if vector_store is None:
+        vector_store = built.get("vector_store")
+    if query_router is None:
+        query_router = built.get("query_router")
+
+    try:
+        await asyncio.to_thread(get_components)
+    except Exception as e:
+        logging.warning("Startup warm-up incomplete, components will load on first request: %s", e)
 
 
 # Request/Response models
@@ -157,6 +304,8 @@ class QueryRequest(BaseModel):
 
 
 class QueryResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     question: str
     answer: str
     sources: List[dict]
@@ -166,80 +315,127 @@ class QueryResponse(BaseModel):
 
 
 class SourceResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     source: str
     source_type: str
     chunk_count: int
 
 
 class UploadResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message: str
     source: str
     chunks_created: int
     document_id: Optional[int] = None
 
 
+class UploadJobResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    job_id: int
+    status: str
+    source: str
+
+
 # Health check endpoint (responds immediately, no heavy loading, no auth)
 @app.get("/health")
 async def health_check():
-    return JSONResponse(
+    return ORJSONResponse(
         content={"status": "healthy", "timestamp": time.time()},
         headers={"Cache-Control": "no-store, no-cache, must-revalidate, max-age=0"}
     )
 
 
 # Root endpoint (no auth)
+# Static response data, built once at import instead of per request
+SUPPORTED_FORMATS = list(SUPPORTED_EXTENSIONS.keys())
+SUPPORTED_FORMATS_TEXT = ", ".join(SUPPORTED_FORMATS)
+
+_ROOT_BODY = orjson.dumps({
+    "message": "Personal Knowledge Base API",
+    "version": "1.0.0",
+    "supported_formats": SUPPORTED_FORMATS,
+    "endpoints": {
+        "health": "GET /health",
+        "upload_document": "POST /api/upload/document (EPUB)",
+        "query": "POST /api/query",
+        "sources": "GET /api/sources",
+        "delete_source": "DELETE /api/sources/{source_name}",
+        "stats": "GET /api/stats"
+    }
+})
+
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Personal Knowledge Base API",
-        "version": "1.0.0",
-        "supported_formats": list(SUPPORTED_EXTENSIONS.keys()),
-        "endpoints": {
-            "health": "GET /health",
-            "upload_document": "POST /api/upload/document (EPUB)",
-            "query": "POST /api/query",
-            "sources": "GET /api/sources",
-            "delete_source": "DELETE /api/sources/{source_name}",
-            "stats": "GET /api/stats"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
-# Supported file extensions and their processors
-SUPPORTED_EXTENSIONS = {
-    ".epub": "epub",
-}
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB} MB."
+    )
 
 
-@app.post("/api/upload/document", response_model=UploadResponse)
-async def upload_document(
-    file: UploadFile = File(...),
-    project_id: Optional[int] = Form(None),
-    current_user: dict = Depends(get_current_user),
-):
-    """Upload and process any supported document type."""
-    filename = file.filename.lower()
-    ext = "." + filename.split(".")[-1] if "." in filename else ""
+async def _spool_upload(file: UploadFile, buf: BinaryIO) -> tuple[int, str]:
+    """Copy an upload into buf. Returns (size in bytes, sha256 hex digest).
 
-    if ext not in SUPPORTED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type. Supported: {', '.join(SUPPORTED_EXTENSIONS.keys())}"
-        )
+    Starlette has already spooled the body to a temp file, so the copy is done
+    file-to-file in the kernel (sendfile) and the hash is taken over an mmap of
+    the result. Falls back to a chunked read/write where that isn't possible.
+    Rejects with 413 as soon as the size is known to pass MAX_UPLOAD_SIZE.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise _upload_too_large()
 
-    processor_type = SUPPORTED_EXTENSIONS[ext]
+    try:
+        src_fd = file.file.fileno()
+        size = await asyncio.to_thread(copy_fd, src_fd, buf.fileno())
+    except (AttributeError, io.UnsupportedOperation, OSError):
+        buf.seek(0)
+        buf.truncate()
+        await file.seek(0)
+        return await _spool_upload_buffered(file, buf)
+
+    if size > MAX_UPLOAD_SIZE:
+        raise _upload_too_large()
+    return size, await asyncio.to_thread(sha256_fd, buf.fileno(), size)
+
+
+async def _spool_upload_buffered(file: UploadFile, buf: BinaryIO) -> tuple[int, str]:
+    """Copy an upload into buf in chunks, hashing and size-checking as it goes."""
+    hasher = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_UPLOAD_SIZE:
+            raise _upload_too_large()
+        hasher.update(chunk)
+        buf.write(chunk)
+    return size, hasher.hexdigest()
+
+
+async def _ingest_upload(
+    path: str,
+    ext: str,
+    filename: str,
+    user_id: int,
+    project_id: Optional[int],
+    size_bytes: int,
+    content_hash: str,
+) -> UploadResponse:
+    """Extract, chunk, embed and record a spooled upload.
+
+    Raises HTTPException with a user-facing detail on any failure.
+    """
     components = get_components()
-    content = await file.read()
-
-    # Check file size
-    if len(content) > MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB} MB."
-        )
+    loop = asyncio.get_running_loop()
 
-    processor = components.get(processor_type)
-    if processor is None:
+    process_file = processor_by_ext.get(ext)
+    if process_file is None:
         raise HTTPException(
             status_code=503,
             detail=f"Processor for {ext} files is not available. Check dependencies."
@@ -247,7 +443,7 @@ async def upload_document(
 
     # Extract text using appropriate processor
     try:
-        documents = processor.process_bytes(content, file.filename)
+        documents = await process_file(path, filename, ingest_executor)
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -257,68 +453,215 @@ async def upload_document(
     if not documents:
         raise HTTPException(
             status_code=400,
-            detail=f"No text found in '{file.filename}'. The file may be empty, contain only images, or be in an unsupported format."
+            detail=f"No text found in '{filename}'. The file may be empty, contain only images, or be in an unsupported format."
         )
 
-    # Chunk the documents
+    # Pipeline chunking into embedding: sections are chunked in groups across the
+    # process pool, and each group goes to the vector writer as soon as it's
+    # chunked, so embedding and upserts overlap the remaining chunking
+    chunk_futures = [
+        loop.run_in_executor(ingest_executor, ingest_workers.chunk_documents, documents[i:i + INGEST_PIPELINE_DOCS])
+        for i in range(0, len(documents), INGEST_PIPELINE_DOCS)
+    ]
+    store_tasks = []
+    chunk_count = 0
     try:
-        chunks = components["chunker"].chunk_documents(documents)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Text processing failed: {str(e)}. Try a different file or check for special characters."
+        for chunk_future in chunk_futures:
+            try:
+                chunks = await chunk_future
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Text processing failed: {str(e)}. Try a different file or check for special characters."
+                )
+            if not chunks:
+                continue
+
+            # Tag chunks with project_id if provided
+            if project_id is not None:
+                for chunk in chunks:
+                    chunk["project_id"] = project_id
+
+            chunk_count += len(chunks)
+            # Coalesced with concurrent uploads; embedding + upsert run in a worker thread
+            store_tasks.append(asyncio.create_task(
+                components.vector_writer.add_documents(chunks, user_id=str(user_id))
+            ))
+
+        if not chunk_count:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Text from '{filename}' is too short (minimum ~100 words needed for meaningful search)."
+            )
+
+        # Store in vector database
+        try:
+            await asyncio.gather(*store_tasks)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=describe_storage_error(e))
+    except BaseException:
+        for chunk_future in chunk_futures:
+            chunk_future.cancel()
+        for task in store_tasks:
+            task.cancel()
+        raise
+
+    doc_id = await documents_db.insert_document(
+        filename=filename,
+        extension=ext,
+        size_bytes=size_bytes,
+        mime_type=get_mime_type(ext),
+        user_id=user_id,
+        project_id=project_id,
+        content_hash=content_hash,
+        chunk_count=chunk_count,
+    )
+
+    return UploadResponse.model_construct(
+        message=f"{ext.upper()[1:]} processed successfully",
+        source=filename,
+        chunks_created=chunk_count,
+        document_id=doc_id,
+    )
+
+
+async def _job_heartbeat() -> None:
+    """Background loop: keep this instance's jobs alive and fail ones whose instance died."""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+        try:
+            await heartbeat_jobs()
+            await fail_stale_jobs()
+        except Exception as e:
+            logging.warning("Upload job heartbeat failed: %s", e)
+
+
+async def _run_upload_job(job_id: int, path: str, ext: str, filename: str, **kwargs) -> None:
+    """Background task: ingest a spooled upload and record the outcome on its job."""
+    try:
+        async with upload_job_slots:
+            if not await update_job(job_id, JOB_PROCESSING):
+                # Failed as stale while waiting for a slot; the client was told so
+                return
+            result = await _ingest_upload(path, ext, filename, **kwargs)
+        await update_job(
+            job_id, JOB_DONE,
+            detail=result.message,
+            document_id=result.document_id,
+            chunks_created=result.chunks_created,
         )
+    except HTTPException as e:
+        await update_job(job_id, JOB_FAILED, detail=e.detail)
+    except Exception as e:
+        logging.exception("Upload job %s failed", job_id)
+        await update_job(job_id, JOB_FAILED, detail=f"Processing failed: {str(e)}")
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+# Duplicates are answered immediately with the existing UploadResponse (200);
+# everything else is accepted as a job (202) and polled via /api/jobs/{job_id}.
+# Re-sending a file whose job is still in flight returns that job instead.
+# The 200 body is returned via model_construct() without a response_model, so
+# the trusted fields are not validated a second time.
+@app.post(
+    "/api/upload/document",
+    responses={200: {"model": UploadResponse}, 202: {"model": UploadJobResponse}},
+)
+async def upload_document(
+    file: UploadFile = File(...),
+    project_id: Optional[int] = Form(None),
+    current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
+):
+    """Upload a supported document and queue it for processing."""
+    ext = get_extension(file.filename)
 
-    if not chunks:
+    if ext not in SUPPORTED_EXTENSION_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Text from '{file.filename}' is too short (minimum ~100 words needed for meaningful search)."
+            detail=f"Unsupported file type. Supported: {SUPPORTED_FORMATS_TEXT}"
         )
 
-    # Tag chunks with project_id if provided
-    if project_id is not None:
-        for chunk in chunks:
-            chunk["project_id"] = project_id
+    # The components dependency has already failed fast on missing configuration
+    if ext not in processor_by_ext:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Processor for {ext} files is not available. Check dependencies."
+        )
 
-    # Store in vector database
+    user_id_int = current_user["user_id"]
+    # Spooled to disk outside the request's lifetime; the job removes it when done
+    tmp = tempfile.NamedTemporaryFile(suffix=ext, dir=UPLOADS_DIR, delete=False)
+    queued = False
     try:
-        user_id_str = str(current_user["user_id"])
-        doc_ids = components["vector_store"].add_documents(chunks, user_id=user_id_str)
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "api" in error_msg or "key" in error_msg or "unauthorized" in error_msg:
-            detail = "Vector database authentication failed. Check your PINECONE_API_KEY and COHERE_API_KEY."
-        elif "timeout" in error_msg or "connection" in error_msg:
-            detail = "Could not connect to vector database. Check your internet connection and try again."
-        elif "quota" in error_msg or "limit" in error_msg or "rate" in error_msg:
-            detail = "API rate limit reached. Wait a moment and try uploading a smaller file."
-        else:
-            detail = f"Failed to store document: {str(e)}"
-        raise HTTPException(status_code=503, detail=detail)
+        with tmp:
+            size_bytes, content_hash = await _spool_upload(file, tmp)
+
+        # Skip extraction, chunking and embedding if this exact file was already ingested
+        existing = await documents_db.get_document_by_hash(content_hash, user_id=user_id_int, project_id=project_id)
+        if existing:
+            return UploadResponse.model_construct(
+                message=f"{ext.upper()[1:]} already processed",
+                source=existing["filename"],
+                chunks_created=existing["chunk_count"],
+                document_id=existing["id"],
+            )
 
-    from backend.documents.database import insert_document
+        # A retry of an upload that is still queued or processing joins that job
+        job_id, status, created = await create_job(
+            file.filename, user_id=user_id_int, project_id=project_id, content_hash=content_hash
+        )
+        if not created:
+            return ORJSONResponse(
+                status_code=202,
+                content={"job_id": job_id, "status": status, "source": file.filename},
+            )
 
-    MIME_MAP = {
-        ".epub": "application/epub+zip",
-    }
-    mime_type = MIME_MAP.get(ext, "application/octet-stream")
+        task = asyncio.create_task(_run_upload_job(
+            job_id, tmp.name, ext, file.filename,
+            user_id=user_id_int,
+            project_id=project_id,
+            size_bytes=size_bytes,
+            content_hash=content_hash,
+        ))
+        # Hold a reference so the task isn't garbage-collected mid-run
+        upload_jobs.add(task)
+        task.add_done_callback(upload_jobs.discard)
+        queued = True
+    finally:
+        if not queued:
+            os.unlink(tmp.name)
 
-    user_id_int = current_user["user_id"]
-    doc_id = await insert_document(
-        filename=file.filename,
-        extension=ext,
-        size_bytes=len(content),
-        mime_type=mime_type,
-        user_id=user_id_int,
-        project_id=project_id,
+    return ORJSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": status, "source": file.filename},
     )
 
-    return UploadResponse(
-        message=f"{ext.upper()[1:]} processed successfully",
-        source=file.filename,
-        chunks_created=len(chunks),
-        document_id=doc_id,
-    )
+
+@app.get("/api/jobs/{job_id}")
+async def get_upload_job(job_id: int, current_user: dict = Depends(get_current_user)):
+    """Get the status of a queued upload."""
+    job = await get_job(job_id, current_user["user_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# Routes answered from retrieved chunks (the rest never embed the query)
+RETRIEVAL_ROUTES = (RouteType.KNOWLEDGE, RouteType.SUMMARY, RouteType.COMPARISON, RouteType.FOLLOW_UP)
+
+
+async def _warm_query_embedding(vector_store: VectorStore, question: str) -> None:
+    """Embed the question while the router's LLM call is in flight; retrieval reuses it."""
+    try:
+        await asyncio.to_thread(vector_store.embed_query, question)
+    except Exception:
+        # Retrieval embeds again and reports the error itself
+        logging.debug("Query embedding warm-up failed", exc_info=True)
 
 
 @app.post("/api/query")
@@ -326,38 +669,64 @@ async def query(
     request: QueryRequest,
     http_request: Request,
     current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
 ):
     """Query the knowledge base with streaming SSE response."""
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty")
 
-    components = get_components()
     user_id_str = str(current_user["user_id"])
     user_id_int = current_user["user_id"]
 
     # Load chat history from conversation if conversation_id is provided
     chat_history = request.chat_history
     if request.conversation_id and user_id_int:
-        if not await ConversationService.verify_ownership(request.conversation_id, user_id_int):
+        # Independent reads; the history is discarded unless ownership checks out
+        owned, history = await asyncio.gather(
+            ConversationService.verify_ownership(request.conversation_id, user_id_int),
+            ConversationService.get_recent_history(request.conversation_id, user_id=user_id_int),
+        )
+        if not owned:
             raise HTTPException(status_code=404, detail="Conversation not found")
-        chat_history = await ConversationService.get_recent_history(request.conversation_id, user_id=user_id_int)
-        await ConversationService.add_message(request.conversation_id, "user", request.question, user_id=user_id_int)
+        chat_history = history
+
+    # Persist the question while the answer streams; awaited before the answer is saved
+    save_question = None
+    if request.conversation_id and user_id_int:
+        save_question = asyncio.create_task(ConversationService.add_message(
+            request.conversation_id, "user", request.question, user_id=user_id_int
+        ))
 
     async def event_stream():
         # Send immediately so HTTP response starts right away
-        yield f"data: {json.dumps({'type': 'status', 'content': 'thinking'})}\n\n"
+        yield SSE_THINKING
 
         accumulated_answer = []
         final_sources = []
 
-        route_handlers = components.get("route_handlers")
+        route_handlers = components.route_handlers
 
         # Use query routing if enabled (RAG mode)
-        if ENABLE_QUERY_ROUTING and components["query_router"] is not None and route_handlers is not None:
-            route_result = await components["query_router"].classify(
-                request.question,
-                chat_history=chat_history
-            )
+        if ENABLE_QUERY_ROUTING and components.query_router is not None and route_handlers is not None:
+            # Keyword-routed queries classify instantly; otherwise overlap the LLM
+            # classification with embedding the question for the likely retrieval
+            route_result = components.query_router.classify_fast(request.question)
+            if route_result is None:
+                warm_up = asyncio.create_task(
+                    _warm_query_embedding(components.vector_store, request.question)
+                )
+                try:
+                    route_result = await components.query_router.classify(
+                        request.question,
+                        chat_history=chat_history,
+                        skip_fast=True,
+                    )
+                    if (route_result.rewritten_query is None
+                            and route_result.route_type in RETRIEVAL_ROUTES):
+                        await warm_up
+                finally:
+                    # Unused by rewritten and non-retrieval routes, or the client left
+                    warm_up.cancel()
 
             try:
                 async for event in route_handlers.handle_stream(
@@ -373,14 +742,14 @@ async def query(
                         accumulated_answer.append(event.get("content", ""))
                     elif event.get("type") == "done":
                         final_sources = event.get("sources", [])
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield sse_event(event)
             except Exception as e:
-                yield f"data: {json.dumps({'type': 'error', 'content': f'LLM error: {str(e)}'})}\n\n"
-                yield f"data: {json.dumps({'type': 'done', 'sources': [], 'chunks_used': 0})}\n\n"
+                yield sse_event({"type": "error", "content": f"LLM error: {str(e)}"})
+                yield sse_event({"type": "done", "sources": [], "chunks_used": 0})
         else:
             # Fallback: stream via query engine LLM
-            qe = components["query_engine"]
-            chunks, reranked = qe.retrieve(
+            qe = components.query_engine
+            chunks, reranked = await qe.aretrieve(
                 question=request.question,
                 top_k=request.top_k,
                 threshold=request.threshold,
@@ -396,13 +765,14 @@ async def query(
                         accumulated_answer.append(event.get("content", ""))
                     elif event.get("type") == "done":
                         final_sources = event.get("sources", [])
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield sse_event(event)
             except Exception as e:
-                yield f"data: {json.dumps({'type': 'error', 'content': f'LLM error: {str(e)}'})}\n\n"
-                yield f"data: {json.dumps({'type': 'done', 'sources': [], 'chunks_used': 0})}\n\n"
+                yield sse_event({"type": "error", "content": f"LLM error: {str(e)}"})
+                yield sse_event({"type": "done", "sources": [], "chunks_used": 0})
 
         # Save assistant response to conversation if conversation_id provided
-        if request.conversation_id and user_id_int:
+        if save_question is not None:
+            await save_question
             full_answer = "".join(accumulated_answer)
             await ConversationService.add_message(
                 request.conversation_id, "assistant", full_answer, final_sources, user_id=user_id_int
@@ -433,9 +803,13 @@ async def list_conversations(current_user: dict = Depends(get_current_user)):
 @app.get("/api/conversations/{conv_id}/messages")
 async def get_messages(conv_id: int, current_user: dict = Depends(get_current_user)):
     """Get all messages in a conversation."""
-    if not await ConversationService.verify_ownership(conv_id, current_user["user_id"]):
+    owned, messages = await asyncio.gather(
+        ConversationService.verify_ownership(conv_id, current_user["user_id"]),
+        ConversationService.get_messages(conv_id, user_id=current_user["user_id"]),
+    )
+    if not owned:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    return await ConversationService.get_messages(conv_id, user_id=current_user["user_id"])
+    return messages
 
 
 @app.delete("/api/conversations/{conv_id}")
@@ -448,23 +822,26 @@ async def delete_conversation(conv_id: int, current_user: dict = Depends(get_cur
 
 
 @app.get("/api/sources", response_model=List[SourceResponse])
-async def get_sources(current_user: dict = Depends(get_current_user)):
+async def get_sources(
+    current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
+):
     """Get all ingested sources for the current user."""
-    components = get_components()
     user_id_str = str(current_user["user_id"])
-    sources = components["vector_store"].get_all_sources(user_id=user_id_str)
-    return [SourceResponse(**s) for s in sources]
+    # Validated once against response_model, not again per SourceResponse(**s).
+    # A memo miss is a full index scan, so keep it off the event loop
+    return await asyncio.to_thread(components.vector_store.get_all_sources, user_id=user_id_str)
 
 
 @app.get("/api/sources/{source_name}/content")
 async def get_source_content(
     source_name: str,
     current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
 ):
     """Get all chunks/content for a specific source document."""
-    components = get_components()
     user_id_str = str(current_user["user_id"])
-    chunks = components["vector_store"].get_chunks_by_source(source_name, user_id=user_id_str)
+    chunks = components.vector_store.get_chunks_by_source(source_name, user_id=user_id_str)
 
     if not chunks:
         raise HTTPException(status_code=404, detail=f"Source '{source_name}' not found")
@@ -480,13 +857,18 @@ async def get_source_content(
 async def delete_source(
     source_name: str,
     current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
 ):
     """Delete all documents from a specific source."""
-    components = get_components()
     user_id_str = str(current_user["user_id"])
-    deleted = components["vector_store"].delete_by_source(source_name, user_id=user_id_str)
+    deleted = components.vector_store.delete_by_source(source_name, user_id=user_id_str)
+    # Drop the DB records too, or their content_hash would answer a re-upload
+    # with "already processed" while nothing is indexed
+    records_deleted = await documents_db.delete_documents_by_filename(
+        source_name, user_id=current_user["user_id"]
+    )
 
-    if deleted == 0:
+    if deleted == 0 and records_deleted == 0:
         raise HTTPException(status_code=404, detail=f"Source '{source_name}' not found")
 
     return {
@@ -500,21 +882,19 @@ async def delete_source(
 async def delete_document(
     doc_id: int,
     current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
 ):
     """Delete a document: DB record, Pinecone vectors, and file on disk."""
-    from backend.documents import database as documents_db
-
     user_id = current_user["user_id"]
     doc = await documents_db.delete_document(doc_id, user_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
     # Delete vectors from Pinecone
-    components = get_components()
     user_id_str = str(user_id) if user_id else None
     chunks_deleted = 0
     try:
-        chunks_deleted = components["vector_store"].delete_by_source(
+        chunks_deleted = components.vector_store.delete_by_source(
             doc["filename"], user_id=user_id_str
         )
     except Exception:
@@ -535,10 +915,10 @@ async def get_chunk_context(
     chunk_id: str,
     context_size: int = 1,
     current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
 ):
     """Get a specific chunk with surrounding context."""
-    components = get_components()
-    result = components["vector_store"].get_chunk_with_context(
+    result = components.vector_store.get_chunk_with_context(
         chunk_id=chunk_id,
         context_size=context_size
     )
@@ -550,17 +930,18 @@ async def get_chunk_context(
 
 
 @app.get("/api/stats")
-async def get_stats(current_user: dict = Depends(get_current_user)):
+async def get_stats(
+    current_user: dict = Depends(get_current_user),
+    components: Components = Depends(require_components),
+):
     """Get knowledge base statistics."""
-    components = get_components()
-    sources = components["vector_store"].get_all_sources()
-    total_chunks = components["vector_store"].count()
+    # Source list is served from the store's sources memo between writes
+    stats = await asyncio.to_thread(components.vector_store.get_stats)
 
     return {
-        "total_sources": len(sources),
-        "total_chunks": total_chunks,
-        "supported_formats": list(SUPPORTED_EXTENSIONS.keys()),
-        "epub_available": is_ebooklib_available(),
+        **stats,
+        "supported_formats": SUPPORTED_FORMATS,
+        "epub_available": EPUB_AVAILABLE,
     }
 
 
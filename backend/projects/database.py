@@ -1,8 +1,18 @@
 """PostgreSQL CRUD operations for the projects table."""
 
-from typing import Optional, List, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Set, Tuple
 from backend.db.connection import get_central_db
 
+# (slug, user_id) -> project row memo for the project routes. Writes through
+# this module evict the key; a rename or delete on another worker can still be
+# served stale for up to PROJECT_CACHE_TTL seconds, so keep it short.
+PROJECT_CACHE_SIZE = 1024
+PROJECT_CACHE_TTL = 5  # seconds
+
+_projects: "OrderedDict[Tuple[str, int], Tuple[Dict[str, Any], float]]" = OrderedDict()
+
 
 async def insert_project(
     slug: str,
@@ -23,17 +33,26 @@ async def insert_project(
         await db.close()
 
 
-async def get_all_projects(user_id: int) -> List[Dict[str, Any]]:
-    """Get all projects with document counts."""
+async def get_all_projects(
+    user_id: int, limit: Optional[int] = None, offset: int = 0
+) -> List[Dict[str, Any]]:
+    """Get projects with document counts, most recently updated first, one page at a time."""
     db = await get_central_db()
     try:
         rows = await db.fetch_all(
             """SELECT p.id, p.slug, p.title, p.description, p.created_at, p.updated_at,
-                      (SELECT COUNT(*) FROM documents d WHERE d.project_id = p.id) as document_count
+                      COALESCE(d.document_count, 0) as document_count
                FROM projects p
+               LEFT JOIN (
+                   SELECT project_id, COUNT(*) as document_count
+                   FROM documents
+                   WHERE user_id = $1 AND project_id IS NOT NULL
+                   GROUP BY project_id
+               ) d ON d.project_id = p.id
                WHERE p.user_id = $1
-               ORDER BY p.updated_at DESC""",
-            user_id,
+               ORDER BY p.updated_at DESC
+               LIMIT $2 OFFSET $3""",
+            user_id, limit, offset,
         )
         return [
             {
@@ -52,7 +71,14 @@ async def get_all_projects(user_id: int) -> List[Dict[str, Any]]:
 
 
 async def get_project_by_slug(slug: str, user_id: int) -> Optional[Dict[str, Any]]:
-    """Get a single project by slug."""
+    """Get a single project by slug (memoized briefly)."""
+    key = (slug, user_id)
+    cached = _projects.get(key)
+    if cached is not None and time.monotonic() - cached[1] < PROJECT_CACHE_TTL:
+        _projects.move_to_end(key)
+        # Callers may annotate the row, so hand out a copy
+        return dict(cached[0])
+
     db = await get_central_db()
     try:
         r = await db.fetch_one(
@@ -60,30 +86,31 @@ async def get_project_by_slug(slug: str, user_id: int) -> Optional[Dict[str, Any
                FROM projects WHERE slug = $1 AND user_id = $2""",
             slug, user_id,
         )
-        if not r:
-            return None
-        return {
-            "id": r["id"],
-            "slug": r["slug"],
-            "title": r["title"],
-            "description": r["description"],
-            "created_at": str(r["created_at"]),
-            "updated_at": str(r["updated_at"]),
-        }
     finally:
         await db.close()
+    if not r:
+        _projects.pop(key, None)
+        return None
+
+    project = {
+        "id": r["id"],
+        "slug": r["slug"],
+        "title": r["title"],
+        "description": r["description"],
+        "created_at": str(r["created_at"]),
+        "updated_at": str(r["updated_at"]),
+    }
+    _projects[key] = (project, time.monotonic())
+    _projects.move_to_end(key)
+    while len(_projects) > PROJECT_CACHE_SIZE:
+        _projects.popitem(last=False)
+    return dict(project)
 
 
 async def get_project_id_by_slug(slug: str, user_id: int) -> Optional[int]:
     """Get just the project ID for a given slug."""
-    db = await get_central_db()
-    try:
-        row = await db.fetch_one(
-            "SELECT id FROM projects WHERE slug = $1 AND user_id = $2", slug, user_id
-        )
-        return row["id"] if row else None
-    finally:
-        await db.close()
+    project = await get_project_by_slug(slug, user_id)
+    return project["id"] if project else None
 
 
 async def update_project(
@@ -98,41 +125,58 @@ async def update_project(
                WHERE slug = $3 AND user_id = $4""",
             title, description, slug, user_id,
         )
-        return result.rowcount > 0
     finally:
         await db.close()
+    # Evict after the write so a concurrent lookup can't re-cache the old row
+    _projects.pop((slug, user_id), None)
+    return result.rowcount > 0
 
 
 async def delete_project(slug: str, user_id: int) -> Optional[int]:
     """Delete a project by slug. Returns the project ID if deleted, None otherwise."""
     db = await get_central_db()
     try:
+        # One statement deletes the project and its documents; the documents FK
+        # is checked at statement end, after both deletes
         row = await db.fetch_one(
-            "SELECT id FROM projects WHERE slug = $1 AND user_id = $2", slug, user_id
-        )
-        if not row:
-            return None
-        project_id = row["id"]
-
-        # Delete documents belonging to this project
-        await db.execute(
-            "DELETE FROM documents WHERE project_id = $1 AND user_id = $2",
-            project_id, user_id,
+            """WITH p AS (
+                   DELETE FROM projects WHERE slug = $1 AND user_id = $2 RETURNING id
+               ), d AS (
+                   DELETE FROM documents
+                   WHERE project_id IN (SELECT id FROM p) AND user_id = $2
+               )
+               SELECT id FROM p""",
+            slug, user_id,
         )
-        # Delete the project
-        await db.execute("DELETE FROM projects WHERE id = $1 AND user_id = $2", project_id, user_id)
-        return project_id
     finally:
         await db.close()
+    # Evict after the delete so a concurrent lookup can't re-cache the old row
+    _projects.pop((slug, user_id), None)
+    return row["id"] if row else None
 
 
 async def slug_exists(slug: str, user_id: int) -> bool:
     """Check if a project slug already exists for this user."""
     db = await get_central_db()
     try:
-        row = await db.fetch_one(
-            "SELECT 1 FROM projects WHERE slug = $1 AND user_id = $2", slug, user_id
+        # Probes the UNIQUE (user_id, slug) index; no row is materialized
+        return await db.fetch_value(
+            "SELECT EXISTS (SELECT 1 FROM projects WHERE user_id = $1 AND slug = $2)",
+            user_id, slug,
+        )
+    finally:
+        await db.close()
+
+
+async def get_taken_slugs(base_slug: str, user_id: int) -> Set[str]:
+    """Get the user's slugs that equal base_slug or extend it with a '-' suffix."""
+    db = await get_central_db()
+    try:
+        # Slugs are [a-z0-9-] only, so base_slug has no LIKE wildcards to escape
+        rows = await db.fetch_all(
+            "SELECT slug FROM projects WHERE user_id = $1 AND (slug = $2 OR slug LIKE $3)",
+            user_id, base_slug, base_slug + "-%",
         )
-        return row is not None
+        return {r["slug"] for r in rows}
     finally:
         await db.close()
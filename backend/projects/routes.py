@@ -1,9 +1,9 @@
 """FastAPI router for project endpoints."""
 
+import asyncio
 import re
-import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 from typing import Optional, List
 
@@ -11,23 +11,42 @@ from backend.auth import get_current_user
 from backend.projects.models import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse
 from backend.projects import database as db
 from backend.documents import database as documents_db
+from backend.config import ENABLE_QUERY_ROUTING
+from backend.routing.query_router import RouteType
+from backend.sse import sse_event, SSE_THINKING
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
+# Largest page GET /api/projects serves; without a limit it returns every project
+PROJECT_LIST_MAX_LIMIT = 500
 
-def _get_components():
-    """Import get_components at call time to avoid circular import with main.py."""
-    from backend.main import get_components
-    return get_components()
+# Runs of anything but lowercase letters and digits collapse to one hyphen
+_SLUG_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+# backend.main.require_components, resolved on first use: main.py imports this module
+_main_require_components = None
+
+
+async def _require_components():
+    """Resolve the shared components through main.require_components."""
+    global _main_require_components
+    if _main_require_components is None:
+        from backend.main import require_components
+        _main_require_components = require_components
+    return await _main_require_components()
 
 
 def generate_slug(title: str) -> str:
     """Convert a title to a URL-friendly slug."""
-    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+    slug = _SLUG_SEPARATORS.sub("-", title.lower()).strip("-")
     return slug[:80]
 
 
-@router.post("", response_model=ProjectResponse)
+# Project responses are built from trusted rows via model_construct() and
+# returned without a response_model, so the fields are not validated again;
+# responses= keeps the documented schema.
+@router.post("", responses={200: {"model": ProjectResponse}})
 async def create_project(
     request: ProjectCreate,
     current_user: dict = Depends(get_current_user),
@@ -36,10 +55,11 @@ async def create_project(
     user_id = current_user["user_id"]
     slug = generate_slug(request.title)
 
-    # Ensure unique slug
+    # Ensure unique slug: fetch every colliding slug at once, then pick the first free suffix
     base_slug = slug
+    taken = await db.get_taken_slugs(base_slug, user_id)
     counter = 1
-    while await db.slug_exists(slug, user_id):
+    while slug in taken:
         slug = f"{base_slug}-{counter}"
         counter += 1
 
@@ -51,29 +71,18 @@ async def create_project(
     )
 
     project = await db.get_project_by_slug(slug, user_id)
-    return ProjectResponse(
-        id=project["id"],
-        slug=project["slug"],
-        title=project["title"],
-        description=project["description"],
-        created_at=project["created_at"],
-        updated_at=project["updated_at"],
-        document_count=0,
-    )
+    return ProjectResponse.model_construct(**project, document_count=0)
 
 
 @router.get("")
 async def list_projects(
+    limit: Optional[int] = Query(None, ge=1, le=PROJECT_LIST_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user),
 ):
-    """List all projects for the current user."""
+    """List the current user's projects, most recently updated first; all of them unless paged."""
     user_id = current_user["user_id"]
-    projects = await db.get_all_projects(user_id)
-
-    components = _get_components()
-    for project in projects:
-        project["document_count"] = 0
-
+    projects = await db.get_all_projects(user_id, limit=limit, offset=offset)
     return {"projects": projects}
 
 
@@ -81,6 +90,7 @@ async def list_projects(
 async def get_project_detail(
     slug: str,
     current_user: dict = Depends(get_current_user),
+    components=Depends(_require_components),
 ):
     """Get a project with its documents."""
     user_id = current_user["user_id"]
@@ -88,35 +98,33 @@ async def get_project_detail(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Get documents from Pinecone tagged with this project
-    components = _get_components()
+    # Get documents from Pinecone tagged with this project, and from the DB, concurrently
     user_id_str = str(user_id)
-
-    documents = []
-    try:
-        all_sources = components["vector_store"].get_all_sources(user_id=user_id_str)
-        for source in all_sources:
-            if source.get("project_id") == project["id"]:
-                documents.append(source)
-    except Exception:
-        pass
-
-    # Enrich documents with document_id from DB so the frontend can target delete actions
-    sqlite_docs = await documents_db.get_documents_by_project(project["id"], user_id=user_id)
-    doc_id_map = {d["filename"]: d["id"] for d in sqlite_docs}
+    documents, sqlite_docs = await asyncio.gather(
+        asyncio.to_thread(
+            components.vector_store.get_all_sources, user_id=user_id_str, project_id=project["id"]
+        ),
+        documents_db.get_documents_by_project(project["id"], user_id=user_id),
+        return_exceptions=True,
+    )
+    if isinstance(sqlite_docs, BaseException):
+        raise sqlite_docs
+    if isinstance(documents, BaseException):
+        documents = []
+
+    # Enrich documents with document_id from DB so the frontend can target delete
+    # actions; DB documents left unmatched aren't in Pinecone yet and are added after
+    unmatched = {d["filename"]: d for d in sqlite_docs}
     for doc in documents:
-        doc["document_id"] = doc_id_map.get(doc.get("source"))
-
-    # Add any DB documents not yet in Pinecone
-    existing_sources = {d.get("source") for d in documents}
-    for sd in sqlite_docs:
-        if sd["filename"] not in existing_sources:
-            documents.append({
-                "source": sd["filename"],
-                "source_type": sd["extension"].lstrip("."),
-                "chunk_count": 0,
-                "document_id": sd["id"],
-            })
+        sd = unmatched.pop(doc.get("source"), None)
+        doc["document_id"] = sd["id"] if sd else None
+    for sd in unmatched.values():
+        documents.append({
+            "source": sd["filename"],
+            "source_type": sd["extension"].lstrip("."),
+            "chunk_count": 0,
+            "document_id": sd["id"],
+        })
 
     return {
         **project,
@@ -125,7 +133,7 @@ async def get_project_detail(
     }
 
 
-@router.put("/{slug}", response_model=ProjectResponse)
+@router.put("/{slug}", responses={200: {"model": ProjectResponse}})
 async def update_project(
     slug: str,
     request: ProjectUpdate,
@@ -143,20 +151,14 @@ async def update_project(
         raise HTTPException(status_code=404, detail="Project not found")
 
     project = await db.get_project_by_slug(slug, user_id)
-    return ProjectResponse(
-        id=project["id"],
-        slug=project["slug"],
-        title=project["title"],
-        description=project["description"],
-        created_at=project["created_at"],
-        updated_at=project["updated_at"],
-    )
+    return ProjectResponse.model_construct(**project)
 
 
 @router.delete("/{slug}")
 async def delete_project(
     slug: str,
     current_user: dict = Depends(get_current_user),
+    components=Depends(_require_components),
 ):
     """Delete a project and its documents (DB rows + Pinecone vectors)."""
     user_id = current_user["user_id"]
@@ -168,11 +170,10 @@ async def delete_project(
     project_docs = await documents_db.get_documents_by_project(project["id"], user_id=user_id)
 
     # Clean up Pinecone for each document
-    components = _get_components()
     user_id_str = str(user_id)
     for doc in project_docs:
         try:
-            components["vector_store"].delete_by_source(
+            components.vector_store.delete_by_source(
                 doc["filename"], user_id=user_id_str
             )
         except Exception:
@@ -192,6 +193,7 @@ async def project_scoped_query(
     slug: str,
     http_request: Request,
     current_user: dict = Depends(get_current_user),
+    components=Depends(_require_components),
 ):
     """Query the knowledge base scoped to a specific project."""
 
@@ -205,24 +207,28 @@ async def project_scoped_query(
     chat_history = body.get("chat_history")
 
     user_id = current_user["user_id"]
-    project = await db.get_project_by_slug(slug, user_id)
-    if not project:
+    project_id = await db.get_project_id_by_slug(slug, user_id)
+    if project_id is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    project_id = project["id"]
-    components = _get_components()
-
-    project_documents = await documents_db.get_documents_by_project(project_id, user_id=user_id)
-    source_names = [d["filename"] for d in project_documents]
+    # Not needed until the query is classified; look the project's documents up meanwhile
+    documents_task = asyncio.create_task(
+        documents_db.get_documents_by_project(project_id, user_id=user_id)
+    )
 
     async def event_stream():
-        yield f"data: {json.dumps({'type': 'status', 'content': 'thinking'})}\n\n"
+        try:
+            async for event in _event_stream():
+                yield event
+        finally:
+            documents_task.cancel()
+
+    async def _event_stream():
+        yield SSE_THINKING
 
         # Query routing: handle non-retrieval routes (GREETING, META, etc.)
-        from backend.config import ENABLE_QUERY_ROUTING
-        from backend.routing.query_router import RouteType
-        query_router = components.get("query_router")
-        rh = components.get("route_handlers")
+        query_router = components.query_router
+        rh = components.route_handlers
         effective_query = question
 
         if ENABLE_QUERY_ROUTING and query_router and rh:
@@ -236,47 +242,52 @@ async def project_scoped_query(
                     query=question,
                     rewritten_query=route_result.rewritten_query,
                 ):
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield sse_event(event)
                 return
 
             # META: list this project's documents specifically
             if route_type == RouteType.META:
+                source_names = [d["filename"] for d in await documents_task]
                 if source_names:
                     doc_list = "\n".join(f"- {name}" for name in source_names)
                     answer = f"This project has {len(source_names)} document(s):\n\n{doc_list}\n\nYou can ask me questions about any of these!"
                 else:
                     answer = "This project doesn't have any documents yet. Upload some to get started!"
-                yield f"data: {json.dumps({'type': 'token', 'content': answer})}\n\n"
-                yield f"data: {json.dumps({'type': 'done', 'sources': [], 'chunks_used': 0, 'provider': 'system', 'route_type': 'META'})}\n\n"
+                yield sse_event({"type": "token", "content": answer})
+                yield sse_event({"type": "done", "sources": [], "chunks_used": 0, "provider": "system", "route_type": "META"})
                 return
 
             # KNOWLEDGE, SUMMARY, COMPARISON, FOLLOW_UP: use rewritten query for retrieval
             effective_query = route_result.rewritten_query or question
 
-        qe = components["query_engine"]
-
-        all_chunks = []
-        for name in source_names:
-            chunks, _ = qe.retrieve(
-                question=effective_query,
-                top_k=top_k,
-                threshold=threshold,
-                source_filter=name,
-            )
-            all_chunks.extend(chunks)
-
-        all_chunks.sort(key=lambda x: x.get("similarity", 0), reverse=True)
-        chunks = all_chunks[:top_k]
+        qe = components.query_engine
+        source_names = [d["filename"] for d in await documents_task]
+
+        # Nothing to retrieve from or ground an answer in: skip the search and the LLM call
+        if not source_names:
+            yield sse_event({"type": "token", "content": "This project doesn't have any documents yet. Upload some to get started!"})
+            yield sse_event({"type": "done", "sources": [], "chunks_used": 0, "provider": "system"})
+            return
+
+        # One filtered search over all of the project's sources, already ranked and cut to top_k
+        chunks, _ = await qe.aretrieve(
+            question=effective_query,
+            top_k=top_k,
+            threshold=threshold,
+            source_filter=source_names,
+            user_id=str(user_id),
+            project_id=project_id,
+        )
 
         try:
             async for event in qe.llm.generate_response_stream(
                 query=effective_query,
                 chunks=chunks,
             ):
-                yield f"data: {json.dumps(event)}\n\n"
+                yield sse_event(event)
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'content': f'LLM error: {str(e)}'})}\n\n"
-            yield f"data: {json.dumps({'type': 'done', 'sources': [], 'chunks_used': 0})}\n\n"
+            yield sse_event({"type": "error", "content": f"LLM error: {str(e)}"})
+            yield sse_event({"type": "done", "sources": [], "chunks_used": 0})
 
     return StreamingResponse(
         event_stream(),
@@ -1,8 +1,15 @@
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Sequence, Union
 from backend.storage.vector_store import VectorStore
 from backend.llm.reasoning import LLMReasoning
 from backend.retrieval.reranker import Reranker
-from backend.config import TOP_K, SIMILARITY_THRESHOLD, USE_RERANKING, RERANK_TOP_K
+from backend.retrieval.semantic_cache import SemanticCache
+from backend.config import (
+    TOP_K, SIMILARITY_THRESHOLD, USE_RERANKING, RERANK_TOP_K, ENABLE_SEMANTIC_CACHE,
+)
+
+# A source name, or several to search together in one query
+SourceFilter = Optional[Union[str, Sequence[str]]]
 
 
 class QueryEngine:
@@ -12,17 +19,56 @@ class QueryEngine:
         self.vector_store = vector_store or VectorStore()
         self.llm = LLMReasoning()
         self.reranker = Reranker()
+        self.retrieval_cache = SemanticCache() if ENABLE_SEMANTIC_CACHE else None
 
     def _retrieve_and_rerank(
         self,
         question: str,
         top_k: int,
         threshold: float,
-        source_filter: Optional[str],
+        source_filter: SourceFilter,
         use_reranking: bool,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        project_id: Optional[int] = None
     ) -> tuple[List[Dict[str, Any]], bool]:
-        """Retrieve chunks and optionally rerank them."""
+        """Retrieve chunks and optionally rerank them, reusing results for repeat queries if cached."""
+        if source_filter is not None and not isinstance(source_filter, str):
+            source_filter = tuple(source_filter)
+        if self.retrieval_cache is None:
+            query_embedding = self.vector_store.embed_query(question)
+            return self._search_and_rerank(
+                question, query_embedding, top_k, threshold, source_filter, use_reranking, user_id, project_id
+            )
+
+        scope = (user_id, project_id, source_filter, top_k, threshold, use_reranking)
+        generation = self.vector_store.generation
+
+        # Exact repeats skip the query embedding too
+        cached = self.retrieval_cache.get_exact(question, scope, generation)
+        if cached is not None:
+            return list(cached[0]), cached[1]
+
+        query_embedding = self.vector_store.embed_query(question)
+        cached = self.retrieval_cache.get_similar(query_embedding, scope, generation)
+        if cached is None:
+            cached = self._search_and_rerank(
+                question, query_embedding, top_k, threshold, source_filter, use_reranking, user_id, project_id
+            )
+        self.retrieval_cache.put(question, query_embedding, scope, generation, cached)
+        return list(cached[0]), cached[1]
+
+    def _search_and_rerank(
+        self,
+        question: str,
+        query_embedding: List[float],
+        top_k: int,
+        threshold: float,
+        source_filter: SourceFilter,
+        use_reranking: bool,
+        user_id: Optional[str],
+        project_id: Optional[int] = None
+    ) -> tuple[List[Dict[str, Any]], bool]:
+        """Search with a precomputed query embedding, then optionally rerank."""
         # Get more chunks if reranking (reranker will filter down)
         retrieve_k = top_k * 2 if use_reranking and self.reranker.is_available() else top_k
 
@@ -31,7 +77,9 @@ class QueryEngine:
             top_k=retrieve_k,
             threshold=threshold,
             source_filter=source_filter,
-            user_id=user_id
+            user_id=user_id,
+            query_embedding=query_embedding,
+            project_id=project_id
         )
 
         # Rerank if enabled and available
@@ -68,13 +116,31 @@ class QueryEngine:
         question: str,
         top_k: int = TOP_K,
         threshold: float = SIMILARITY_THRESHOLD,
-        source_filter: Optional[str] = None,
+        source_filter: SourceFilter = None,
         use_reranking: bool = USE_RERANKING,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        project_id: Optional[int] = None
     ) -> tuple[List[Dict[str, Any]], bool]:
         """Retrieve and rerank chunks without LLM generation (for streaming)."""
         return self._retrieve_and_rerank(
-            question, top_k, threshold, source_filter, use_reranking, user_id=user_id
+            question, top_k, threshold, source_filter, use_reranking, user_id=user_id, project_id=project_id
+        )
+
+    async def aretrieve(
+        self,
+        question: str,
+        top_k: int = TOP_K,
+        threshold: float = SIMILARITY_THRESHOLD,
+        source_filter: SourceFilter = None,
+        use_reranking: bool = USE_RERANKING,
+        user_id: Optional[str] = None,
+        project_id: Optional[int] = None
+    ) -> tuple[List[Dict[str, Any]], bool]:
+        """Async retrieve(): the blocking embed/search/rerank calls run in a worker
+        thread so streaming responses keep flowing while they wait."""
+        return await asyncio.to_thread(
+            self._retrieve_and_rerank,
+            question, top_k, threshold, source_filter, use_reranking, user_id=user_id, project_id=project_id
         )
 
     async def query(
@@ -82,7 +148,7 @@ class QueryEngine:
         question: str,
         top_k: int = TOP_K,
         threshold: float = SIMILARITY_THRESHOLD,
-        source_filter: Optional[str] = None,
+        source_filter: SourceFilter = None,
         use_reranking: bool = USE_RERANKING,
         user_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -100,7 +166,7 @@ class QueryEngine:
         Returns:
             Dict with 'answer', 'sources', 'chunks_used', and 'provider'
         """
-        chunks, reranked = self._retrieve_and_rerank(
+        chunks, reranked = await self.aretrieve(
             question, top_k, threshold, source_filter, use_reranking, user_id=user_id
         )
 
@@ -113,7 +179,7 @@ class QueryEngine:
         question: str,
         top_k: int = TOP_K,
         threshold: float = SIMILARITY_THRESHOLD,
-        source_filter: Optional[str] = None,
+        source_filter: SourceFilter = None,
         use_reranking: bool = USE_RERANKING,
         user_id: Optional[str] = None
     ) -> Dict[str, Any]:
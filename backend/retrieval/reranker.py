@@ -2,6 +2,7 @@ from typing import List, Dict, Any
 from langchain_cohere import CohereRerank
 from langchain_core.documents import Document
 from backend.config import COHERE_API_KEY, RERANK_MODEL, RERANK_TOP_K
+from backend.http_clients import get_cohere_client_v2
 
 
 class Reranker:
@@ -14,6 +15,7 @@ class Reranker:
         if COHERE_API_KEY:
             try:
                 self.reranker = CohereRerank(
+                    client=get_cohere_client_v2(),
                     model=RERANK_MODEL,
                     cohere_api_key=COHERE_API_KEY,
                     top_n=RERANK_TOP_K,
@@ -0,0 +1,104 @@
+"""Semantic cache of retrieval results for repeated and near-duplicate queries."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_SIZE
+
+# Cached embeddings are int8 codes plus one float step per vector (symmetric
+# per-vector scalar quantization): a quarter of the float32 size, with cosine
+# error around 0.001 on 1024-dim embeddings
+_INT8_MAX = 127
+
+# (int8 codes, step) such that component i ~= codes[i] * step, for a unit vector
+Quantized = Tuple[np.ndarray, float]
+
+
+class SemanticCache:
+    """
+    Reuse retrieval results when a query matches, or nearly matches, an earlier one.
+
+    Entries are scoped (user, source filter, retrieval params) and tagged with
+    the vector store generation they were computed at, so any upload or delete
+    invalidates them. Exact repeats are found by text without embedding the
+    query; otherwise the nearest cached query embedding in the same scope is
+    used if its cosine similarity reaches the threshold. Cached embeddings
+    are int8-quantized.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_SIZE,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (scope, normalized query) -> (quantized unit embedding, value, timestamp, generation)
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Quantized, Any, float, int]]" = OrderedDict()
+        # Retrieval runs in worker threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _fresh(self, entry: Tuple[Quantized, Any, float, int], generation: int) -> bool:
+        return entry[3] == generation and time.monotonic() - entry[2] < self.ttl
+
+    def get_exact(self, query: str, scope: Hashable, generation: int) -> Optional[Any]:
+        """Cached value for the same query text in scope, without needing its embedding."""
+        key = (scope, self._normalize(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._fresh(entry, generation):
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_similar(self, embedding: List[float], scope: Hashable, generation: int) -> Optional[Any]:
+        """Cached value for the most similar query in scope, if it clears the threshold."""
+        codes, step = self._quantize(embedding)
+        with self._lock:
+            candidates = [
+                (key, entry[0]) for key, entry in self._entries.items()
+                if key[0] == scope and self._fresh(entry, generation)
+            ]
+            if not candidates:
+                return None
+            # One int8 x int32 matrix-vector product scores every candidate
+            matrix = np.stack([quantized[0] for _, quantized in candidates])
+            steps = np.array([quantized[1] for _, quantized in candidates])
+            scores = (matrix @ codes.astype(np.int32)) * steps * step
+            best = int(scores.argmax())
+            if scores[best] < self.threshold:
+                return None
+            best_key = candidates[best][0]
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def put(self, query: str, embedding: List[float], scope: Hashable, generation: int, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        key = (scope, self._normalize(query))
+        entry = (self._quantize(embedding), value, time.monotonic(), generation)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _quantize(embedding: List[float]) -> Quantized:
+        """Normalize to unit length and map the largest component to +/-127."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector)) or 1.0
+        peak = float(np.abs(vector).max(initial=0.0)) / norm or 1.0
+        step = peak / _INT8_MAX
+        codes = np.rint(vector / (norm * step)).clip(-_INT8_MAX, _INT8_MAX).astype(np.int8)
+        return codes, step
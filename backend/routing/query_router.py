@@ -1,8 +1,11 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional, Tuple, List, Dict
 from enum import Enum
+import hashlib
 import re
-from backend.config import GROQ_API_KEY, GROQ_MODEL, ROUTER_TEMPERATURE
+import orjson
+from backend.config import GROQ_API_KEY, GROQ_MODEL, ROUTER_TEMPERATURE, CHAT_HISTORY_MAX_CHARS
 
 
 class RouteType(str, Enum):
@@ -37,7 +40,7 @@ SUMMARY_PATTERNS = [
     r"^summarize\s+",
     r"^(give|provide|create)\s*(me\s*)?(a\s*)?summary",
     r"^(what\s*is\s*the\s*)?(main|key)\s*(points?|ideas?|takeaways?)",
-    r"^tldr\s*",
+    r"^tl;?dr\b",
     r"summarize\s*(this|the|that)",
 ]
 
@@ -137,6 +140,10 @@ User Query: "{query}"
 Respond with ONLY the category name, nothing else."""
 
 
+# Max number of LLM classification results kept in memory
+CLASSIFY_CACHE_SIZE = 2048
+
+
 # LangChain LCEL chain initialization (lazy)
 _classify_chain = None
 _rewrite_chain = None
@@ -156,12 +163,14 @@ def _get_chains():
     from langchain_groq import ChatGroq
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_core.output_parsers import StrOutputParser
+    from backend.http_clients import groq_client_kwargs
 
     _llm = ChatGroq(
         api_key=GROQ_API_KEY,
         model_name=GROQ_MODEL,
         temperature=ROUTER_TEMPERATURE,
         max_tokens=150,
+        **groq_client_kwargs(),
     )
 
     # Classification chain: prompt -> LLM -> parse string output
@@ -190,6 +199,7 @@ class QueryRouter:
         self._comparison_re = [re.compile(p, re.IGNORECASE) for p in COMPARISON_PATTERNS]
         self._clarification_re = [re.compile(p, re.IGNORECASE) for p in CLARIFICATION_PATTERNS]
         self._pronoun_re = [re.compile(p, re.IGNORECASE) for p in PRONOUN_PATTERNS]
+        self._cache: "OrderedDict[Tuple[str, bytes], RouteResult]" = OrderedDict()
 
     def _keyword_prefilter(self, query: str) -> Optional[Tuple[RouteType, str]]:
         """
@@ -221,6 +231,35 @@ class QueryRouter:
 
         return None
 
+    def classify_fast(self, query: str) -> Optional[RouteResult]:
+        """Deterministic routing for obvious queries, or None if an LLM call is needed."""
+        prefilter_result = self._keyword_prefilter(query)
+        if not prefilter_result:
+            return None
+        route_type, reasoning = prefilter_result
+        return RouteResult(
+            route_type=route_type,
+            confidence=0.9,
+            reasoning=reasoning
+        )
+
+    def _cache_key(self, query: str, chat_history: Optional[List[Dict[str, str]]]) -> Tuple[str, bytes]:
+        """Build a cache key from the normalized query and a digest of the chat history.
+
+        The history comes from the client as parsed JSON, so it is serialized
+        rather than hashed directly (its values may be lists or dicts).
+        """
+        history = hashlib.blake2b(orjson.dumps(chat_history or []), digest_size=16).digest()
+        return (" ".join(query.lower().split()), history)
+
+    def _cache_put(self, key: Tuple[str, bytes], result: RouteResult) -> RouteResult:
+        """Store a classification result, evicting the least recently used entry."""
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > CLASSIFY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
     def _needs_rewrite(self, query: str) -> bool:
         """Check if query contains references that need coreference resolution."""
         for pattern in self._pronoun_re:
@@ -234,8 +273,8 @@ class QueryRouter:
         for msg in chat_history:
             role = msg.get("role", "user").capitalize()
             content = msg.get("content", "")
-            if len(content) > 500:
-                content = content[:500] + "..."
+            if len(content) > CHAT_HISTORY_MAX_CHARS:
+                content = content[:CHAT_HISTORY_MAX_CHARS] + "..."
             lines.append(f"{role}: {content}")
         return "\n".join(lines)
 
@@ -273,22 +312,31 @@ class QueryRouter:
 
         return RouteType.KNOWLEDGE
 
-    async def classify(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> RouteResult:
+    async def classify(
+        self,
+        query: str,
+        chat_history: Optional[List[Dict[str, str]]] = None,
+        skip_fast: bool = False,
+    ) -> RouteResult:
         """
         Classify a query into a route type using LangChain LCEL chains.
 
         Uses keyword pre-filter first for speed, falls back to LangChain LCEL for complex cases.
+        Pass skip_fast=True if the caller already tried classify_fast().
         When chat_history is provided, rewrites referential queries before classification.
+        Successful LLM classifications are cached per (query, chat history).
         """
         # Try fast keyword pre-filter first
-        prefilter_result = self._keyword_prefilter(query)
-        if prefilter_result:
-            route_type, reasoning = prefilter_result
-            return RouteResult(
-                route_type=route_type,
-                confidence=0.9,
-                reasoning=reasoning
-            )
+        if not skip_fast:
+            fast_result = self.classify_fast(query)
+            if fast_result:
+                return fast_result
+
+        cache_key = self._cache_key(query, chat_history)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return cached
 
         classify_chain, rewrite_chain = _get_chains()
 
@@ -302,12 +350,12 @@ class QueryRouter:
                 route_type, corrected = self._parse_classify_output(raw)
                 if corrected and corrected.lower() == query.lower():
                     corrected = None
-                return RouteResult(
+                return self._cache_put(cache_key, RouteResult(
                     route_type=route_type,
                     confidence=1.0,
                     reasoning="LangChain LCEL classify+correct",
                     rewritten_query=corrected
-                )
+                ))
             except Exception:
                 return RouteResult(route_type=RouteType.KNOWLEDGE, confidence=0.5, reasoning="Classification error")
 
@@ -346,12 +394,12 @@ class QueryRouter:
             raw = await classify_only_chain.ainvoke({"query": classify_query})
             route_type = self._parse_response(raw)
 
-            return RouteResult(
+            return self._cache_put(cache_key, RouteResult(
                 route_type=route_type,
                 confidence=1.0,
                 reasoning="LangChain LCEL rewrite+classify",
                 rewritten_query=rewritten_query
-            )
+            ))
         except Exception:
             return RouteResult(
                 route_type=RouteType.KNOWLEDGE,
@@ -362,14 +410,9 @@ class QueryRouter:
 
     def classify_sync(self, query: str) -> RouteResult:
         """Synchronous version of classify."""
-        prefilter_result = self._keyword_prefilter(query)
-        if prefilter_result:
-            route_type, reasoning = prefilter_result
-            return RouteResult(
-                route_type=route_type,
-                confidence=0.9,
-                reasoning=reasoning
-            )
+        fast_result = self.classify_fast(query)
+        if fast_result:
+            return fast_result
 
         classify_chain, _ = _get_chains()
         if not classify_chain:
@@ -2,6 +2,7 @@ from typing import Dict, Any, List, Optional, AsyncGenerator
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from backend.config import GROQ_API_KEY, GROQ_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS, SYSTEM_PROMPT
+from backend.http_clients import groq_client_kwargs
 from backend.routing.query_router import RouteType
 
 
@@ -25,6 +26,7 @@ class RouteHandlers:
             api_key=key,
             temperature=LLM_TEMPERATURE,
             max_tokens=LLM_MAX_TOKENS,
+            **groq_client_kwargs(),
         ) if key else None
 
     def _call_llm(self, system_prompt: str, user_message: str) -> Optional[str]:
@@ -69,6 +71,13 @@ class RouteHandlers:
             })
         return sources
 
+    def _format_chunks(self, chunks: List[Dict[str, Any]]) -> str:
+        """Join chunk texts, each headed by its source, for summary and comparison prompts."""
+        return "\n\n".join([
+            f"[From: {chunk.get('metadata', {}).get('source', 'Unknown')}]\n{chunk.get('text', '')}"
+            for chunk in chunks
+        ])
+
     async def handle_knowledge(
         self,
         query: str,
@@ -480,7 +489,7 @@ If the user seems to want help, mention that you can answer questions about thei
             retrieve_top_k = top_k
             retrieve_threshold = threshold
 
-        chunks, reranked = self.query_engine.retrieve(
+        chunks, reranked = await self.query_engine.aretrieve(
             question=effective_query,
             top_k=retrieve_top_k,
             threshold=retrieve_threshold,
@@ -510,11 +519,6 @@ If the user seems to want help, mention that you can answer questions about thei
             return
 
         # Build context and choose prompt based on route type
-        chunks_text = "\n\n".join([
-            f"[From: {chunk.get('metadata', {}).get('source', 'Unknown')}]\n{chunk.get('text', '')}"
-            for chunk in chunks
-        ])
-
         if route_type == RouteType.SUMMARY:
             system_prompt = """You are a summarization assistant for a personal document library. Based on the provided context passages, create a clear and structured summary.
 
@@ -524,6 +528,7 @@ Rules:
 3. If the context only covers part of the topic, note what's covered and what might be missing.
 4. Never fabricate information not present in the context.
 5. Do NOT include source citations - sources are displayed separately."""
+            chunks_text = self._format_chunks(chunks)
             user_message = f"Please summarize the following content:\n\n{chunks_text}\n\nOriginal request: {effective_query}"
         elif route_type == RouteType.COMPARISON:
             system_prompt = """You are a comparison assistant for a personal document library. Based on the provided context passages, create a clear and structured comparison.
@@ -534,6 +539,7 @@ Rules:
 3. If information about one or more items is missing from the context, clearly note what's available and what couldn't be found.
 4. Never fabricate information not present in the context.
 5. Do NOT include source citations - sources are displayed separately."""
+            chunks_text = self._format_chunks(chunks)
             user_message = f"Please compare based on the following content:\n\n{chunks_text}\n\nComparison request: {effective_query}"
         else:
             # KNOWLEDGE / FOLLOW_UP: standard RAG prompt
@@ -0,0 +1,12 @@
+"""Server-sent event framing shared by the streaming query endpoints."""
+
+import orjson
+
+
+def sse_event(payload: dict) -> bytes:
+    """Frame a payload as one SSE data event, already UTF-8 encoded for the response body."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+# Sent first by every query stream; framed once at import
+SSE_THINKING = sse_event({"type": "status", "content": "thinking"})
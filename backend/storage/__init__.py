@@ -1,3 +1,4 @@
 from .vector_store import VectorStore
+from .write_batcher import VectorWriteBatcher
 
-__all__ = ["VectorStore"]
+__all__ = ["VectorStore", "VectorWriteBatcher"]
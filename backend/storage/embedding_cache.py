@@ -0,0 +1,140 @@
+"""Content-addressed cache for document embeddings."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH, COHERE_EMBED_DIMENSION
+
+logger = logging.getLogger(__name__)
+
+# Max bound parameters per SELECT ... IN (...) lookup
+SQLITE_LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings keyed by (model, hash of chunk text).
+
+    Re-uploading a file, or uploading books that share sections, only pays
+    for embedding chunks whose text has not been seen before. Vectors are
+    stored as float32 arrays (~4 KB per 1024-dim vector).
+
+    With a path, entries are also written to a SQLite file so they survive
+    restarts; memory misses fall through to it before calling the embedder.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = EMBEDDING_CACHE_SIZE,
+        path: Optional[str] = EMBEDDING_CACHE_PATH,
+        dimension: int = COHERE_EMBED_DIMENSION,
+    ):
+        self.model = model
+        self.max_entries = max_entries
+        self.dimension = dimension
+        self._entries: "OrderedDict[bytes, array]" = OrderedDict()
+        # Ingest embeds from several worker threads: _entries_lock guards the LRU,
+        # _lock serializes the one shared SQLite connection
+        self._entries_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._db = self._open(path) if path else None
+
+    @staticmethod
+    def _open(path: str) -> Optional[sqlite3.Connection]:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            # WAL + synchronous=NORMAL: commits skip the per-write fsync; losing the
+            # last few writes on power loss only costs a re-embed
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            return db
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache at %s unavailable, using memory only: %s", path, e)
+            return None
+
+    def _key(self, text: str) -> bytes:
+        h = hashlib.blake2b(self.model.encode("utf-8") + b"\0", digest_size=16)
+        h.update(text.encode("utf-8"))
+        return h.digest()
+
+    def _remember(self, items: Iterable[Tuple[bytes, array]]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._entries_lock:
+            for key, vector in items:
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, keys: List[bytes]) -> Dict[bytes, array]:
+        """Read persisted vectors for keys, skipping any of the wrong dimension."""
+        found: Dict[bytes, array] = {}
+        if self._db is None or not keys:
+            return found
+        with self._lock:
+            for i in range(0, len(keys), SQLITE_LOOKUP_BATCH_SIZE):
+                batch = keys[i:i + SQLITE_LOOKUP_BATCH_SIZE]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    # Rows from a model with a different dimension would corrupt upserts
+                    if len(vector) == self.dimension:
+                        found[key] = vector
+        self._remember(found.items())
+        return found
+
+    def _store(self, items: Iterable[Tuple[bytes, array]]) -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items],
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Failed to persist embeddings: %s", e)
+
+    def embed_documents(
+        self, texts: List[str], embed: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """Return embeddings for texts, calling embed() only for uncached (deduplicated) texts."""
+        keys = [self._key(text) for text in texts]
+        cached: Dict[bytes, array] = {}
+        with self._entries_lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    cached[key] = vector
+
+        # One batched disk lookup for everything memory didn't have
+        cached.update(self._load([key for key in dict.fromkeys(keys) if key not in cached]))
+
+        # Deduplicate misses so repeated chunks in one upload are embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            computed = [array("f", embedding) for embedding in embed(list(missing.values()))]
+            new_entries = list(zip(missing.keys(), computed))
+            self._remember(new_entries)
+            cached.update(new_entries)
+            self._store(new_entries)
+
+        return [cached[key].tolist() for key in keys]
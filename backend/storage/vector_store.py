@@ -1,16 +1,29 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from langchain_cohere import CohereEmbeddings
 from pinecone import Pinecone, ServerlessSpec
 from backend.config import (
     TOP_K, SIMILARITY_THRESHOLD, PINECONE_API_KEY, PINECONE_INDEX_NAME,
-    COHERE_API_KEY, COHERE_EMBED_MODEL, COHERE_EMBED_DIMENSION
+    COHERE_API_KEY, COHERE_EMBED_MODEL, COHERE_EMBED_DIMENSION,
+    HTTP_MAX_CONNECTIONS, SOURCES_CACHE_TTL,
 )
+from backend.http_clients import get_cohere_client
+from backend.storage.embedding_cache import EmbeddingCache
 
 # API batch size limits
 PINECONE_UPSERT_BATCH_SIZE = 100  # Pinecone recommended batch size
 PINECONE_DELETE_BATCH_SIZE = 100  # Pinecone delete batch size
 
+# Bulk upsert path: at or above this many vectors, batches are sent in parallel
+PINECONE_BULK_UPSERT_THRESHOLD = 1000
+PINECONE_UPSERT_POOL_THREADS = 16  # Concurrent upsert requests in the bulk path
+
+# Recent query embeddings kept so a warmed or repeated query isn't re-embedded
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
 # Query limits (free tier workaround - no "list all" API)
 PINECONE_MAX_QUERY_RESULTS = 10000  # Max results per query
 
@@ -39,6 +52,17 @@ class VectorStore:
             model=COHERE_EMBED_MODEL,
             cohere_api_key=COHERE_API_KEY,
         )
+        # Route embedding calls through the shared keep-alive connection pool
+        self.embeddings.client = get_cohere_client()
+        self.embedding_cache = EmbeddingCache(COHERE_EMBED_MODEL)
+        self._query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        # embed_query runs in worker threads
+        self._query_embeddings_lock = threading.Lock()
+
+        # (user_id, project_id) -> (monotonic timestamp, sources); cleared on every write
+        self._sources_cache: Dict[Tuple[Optional[str], Optional[int]], Tuple[float, List[Dict[str, Any]]]] = {}
+        # Bumped on every write so downstream caches can tell their results are stale
+        self.generation = 0
 
         # Create index if it doesn't exist
         if PINECONE_INDEX_NAME not in self.pc.list_indexes().names():
@@ -52,18 +76,38 @@ class VectorStore:
                 )
             )
 
-        # Connect to index
-        self.index = self.pc.Index(PINECONE_INDEX_NAME)
+        # Connect to index (keep-alive pool sized to match the Cohere pool)
+        self.index = self.pc.Index(
+            PINECONE_INDEX_NAME,
+            pool_threads=PINECONE_UPSERT_POOL_THREADS,
+            connection_pool_maxsize=HTTP_MAX_CONNECTIONS,
+        )
 
-    def _get_query_embedding(self, text: str) -> List[float]:
-        """Get embedding for a query using LangChain CohereEmbeddings."""
-        return self.embeddings.embed_query(text)
+    def _mark_written(self) -> None:
+        """Invalidate read caches after a write; scans begun before it see the new generation and don't memoize."""
+        self._sources_cache.clear()
+        self.generation += 1
+
+    def embed_query(self, text: str) -> List[float]:
+        """Get embedding for a query using LangChain CohereEmbeddings, reusing recent ones."""
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(text)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(text)
+                return embedding
+
+        embedding = self.embeddings.embed_query(text)
+        with self._query_embeddings_lock:
+            self._query_embeddings[text] = embedding
+            while len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return embedding
 
     def _get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for multiple texts using LangChain CohereEmbeddings."""
+        """Get embeddings for multiple texts, embedding only texts not already cached."""
         if not texts:
             return []
-        return self.embeddings.embed_documents(texts)
+        return self.embedding_cache.embed_documents(texts, self.embeddings.embed_documents)
 
     def add_documents(self, documents: List[Dict[str, Any]], user_id: Optional[str] = None) -> List[str]:
         """
@@ -79,49 +123,72 @@ class VectorStore:
         if not documents:
             return []
 
+        return self.add_document_batches([(documents, user_id)])[0]
+
+    def add_document_batches(
+        self, batches: List[Tuple[List[Dict[str, Any]], Optional[str]]]
+    ) -> List[List[str]]:
+        """
+        Add several (documents, user_id) groups with one embedding pass and shared upserts.
+
+        Args:
+            batches: List of (documents, user_id) pairs, e.g. from concurrent uploads
+
+        Returns:
+            List of document ID lists, one per input group
+        """
         ids = []
         texts = []
         metadatas = []
+        id_groups = []
 
-        for doc in documents:
-            doc_id = str(uuid.uuid4())
-            ids.append(doc_id)
-            texts.append(doc["text"])
+        for documents, user_id in batches:
+            group_ids = []
+            for doc in documents:
+                doc_id = str(uuid.uuid4())
+                ids.append(doc_id)
+                group_ids.append(doc_id)
+                texts.append(doc["text"])
 
-            # Prepare metadata
-            metadata = {
-                "source": str(doc.get("source", "unknown")),
-                "source_type": str(doc.get("source_type", "unknown")),
-                "chunk_index": int(doc.get("chunk_index", 0)),
-                "total_chunks": int(doc.get("total_chunks", 1)),
-            }
+                # Prepare metadata
+                metadata = {
+                    "source": str(doc.get("source", "unknown")),
+                    "source_type": str(doc.get("source_type", "unknown")),
+                    "chunk_index": int(doc.get("chunk_index", 0)),
+                    "total_chunks": int(doc.get("total_chunks", 1)),
+                }
 
-            if user_id:
-                metadata["user_id"] = str(user_id)
+                if user_id:
+                    metadata["user_id"] = str(user_id)
 
-            if doc.get("page") is not None:
-                metadata["page"] = int(doc["page"])
+                if doc.get("page") is not None:
+                    metadata["page"] = int(doc["page"])
 
-            if doc.get("timestamp"):
-                metadata["timestamp"] = str(doc["timestamp"])
+                if doc.get("timestamp"):
+                    metadata["timestamp"] = str(doc["timestamp"])
 
-            if doc.get("token_count"):
-                metadata["token_count"] = int(doc["token_count"])
+                if doc.get("token_count"):
+                    metadata["token_count"] = int(doc["token_count"])
 
-            if doc.get("project_id") is not None:
-                metadata["project_id"] = int(doc["project_id"])
+                if doc.get("project_id") is not None:
+                    metadata["project_id"] = int(doc["project_id"])
 
-            # EPUB heading structure metadata
-            if doc.get("chapter_title"):
-                metadata["chapter_title"] = str(doc["chapter_title"])
-            if doc.get("section_title"):
-                metadata["section_title"] = str(doc["section_title"])
-            if doc.get("heading_level") is not None:
-                metadata["heading_level"] = int(doc["heading_level"])
-            if doc.get("heading_hierarchy"):
-                metadata["heading_hierarchy"] = doc["heading_hierarchy"]
+                # EPUB heading structure metadata
+                if doc.get("chapter_title"):
+                    metadata["chapter_title"] = str(doc["chapter_title"])
+                if doc.get("section_title"):
+                    metadata["section_title"] = str(doc["section_title"])
+                if doc.get("heading_level") is not None:
+                    metadata["heading_level"] = int(doc["heading_level"])
+                if doc.get("heading_hierarchy"):
+                    metadata["heading_hierarchy"] = doc["heading_hierarchy"]
 
-            metadatas.append(metadata)
+                metadatas.append(metadata)
+
+            id_groups.append(group_ids)
+
+        if not texts:
+            return id_groups
 
         # Get embeddings for all texts
         embeddings = self._get_embeddings_batch(texts)
@@ -137,20 +204,33 @@ class VectorStore:
                 "metadata": metadata
             })
 
-        # Upsert in batches
-        for i in range(0, len(vectors), PINECONE_UPSERT_BATCH_SIZE):
-            batch = vectors[i:i + PINECONE_UPSERT_BATCH_SIZE]
-            self.index.upsert(vectors=batch)
+        batches = [
+            vectors[i:i + PINECONE_UPSERT_BATCH_SIZE]
+            for i in range(0, len(vectors), PINECONE_UPSERT_BATCH_SIZE)
+        ]
 
-        return ids
+        if len(vectors) >= PINECONE_BULK_UPSERT_THRESHOLD:
+            # Bulk path: send all batches concurrently on the index's thread pool
+            async_results = [self.index.upsert(vectors=batch, async_req=True) for batch in batches]
+            for result in async_results:
+                result.get()
+        else:
+            # Upsert in batches
+            for batch in batches:
+                self.index.upsert(vectors=batch)
+
+        self._mark_written()
+        return id_groups
 
     def search(
         self,
         query: str,
         top_k: int = TOP_K,
         threshold: float = SIMILARITY_THRESHOLD,
-        source_filter: Optional[str] = None,
-        user_id: Optional[str] = None
+        source_filter: Optional[Union[str, Sequence[str]]] = None,
+        user_id: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        project_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Semantic search for similar documents.
@@ -159,21 +239,29 @@ class VectorStore:
             query: Search query
             top_k: Number of results to return
             threshold: Minimum similarity score
-            source_filter: Optional filter by source name
+            source_filter: Optional filter by source name, or by any of several names
             user_id: Optional user ID for per-user isolation
+            query_embedding: Precomputed embedding of query, if the caller has one
+            project_id: Optional filter by project
 
         Returns:
             List of matching documents with scores
         """
         # Get query embedding
-        query_embedding = self._get_query_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
 
         # Build filter
         filters = []
-        if source_filter:
+        if isinstance(source_filter, str):
             filters.append({"source": {"$eq": source_filter}})
+        elif source_filter:
+            # One filtered query across several sources instead of one query per source
+            filters.append({"source": {"$in": list(source_filter)}})
         if user_id:
             filters.append({"user_id": {"$eq": str(user_id)}})
+        if project_id is not None:
+            filters.append({"project_id": {"$eq": int(project_id)}})
 
         filter_dict = None
         if len(filters) == 1:
@@ -206,14 +294,39 @@ class VectorStore:
 
         return documents
 
-    def get_all_sources(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all unique sources, optionally filtered by user."""
+    def get_all_sources(
+        self, user_id: Optional[str] = None, project_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all unique sources, optionally filtered by user and project.
+
+        The filters are applied by Pinecone, so a project's sources aren't cut
+        off by the scan limit of the user's whole library. Results are memoized
+        for SOURCES_CACHE_TTL seconds so polling clients don't rescan the index;
+        writes through this store clear the memo.
+        """
+        cache_key = (user_id, project_id)
+        cached = self._sources_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < SOURCES_CACHE_TTL:
+            # Callers annotate the returned dicts, so hand out copies
+            return [dict(s) for s in cached[1]]
+
+        # A write during the scan bumps this; its result may be stale then
+        generation = self.generation
         sources = {}
 
         try:
             # Using a zero vector query with large top_k (Pinecone free tier workaround)
             dummy_vector = [0.0] * COHERE_EMBED_DIMENSION
-            filter_dict = {"user_id": {"$eq": str(user_id)}} if user_id else None
+            filters = []
+            if user_id:
+                filters.append({"user_id": {"$eq": str(user_id)}})
+            if project_id is not None:
+                filters.append({"project_id": {"$eq": int(project_id)}})
+            filter_dict = None
+            if len(filters) == 1:
+                filter_dict = filters[0]
+            elif len(filters) > 1:
+                filter_dict = {"$and": filters}
             results = self.index.query(
                 vector=dummy_vector,
                 top_k=PINECONE_MAX_QUERY_RESULTS,
@@ -238,7 +351,10 @@ class VectorStore:
             # Return empty list on error - caller can handle appropriately
             return []
 
-        return list(sources.values())
+        result = list(sources.values())
+        if self.generation == generation:
+            self._sources_cache[cache_key] = (time.monotonic(), [dict(s) for s in result])
+        return result
 
     def delete_by_source(self, source_name: str, user_id: Optional[str] = None) -> int:
         """
@@ -275,6 +391,7 @@ class VectorStore:
             batch = ids_to_delete[i:i + PINECONE_DELETE_BATCH_SIZE]
             self.index.delete(ids=batch)
 
+        self._mark_written()
         return len(ids_to_delete)
 
     def count(self) -> int:
@@ -287,6 +404,23 @@ class VectorStore:
         stats = self.index.describe_index_stats()
         return stats.total_vector_count
 
+    def get_stats(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Get source and chunk totals.
+
+        The source count comes from the (memoized) get_all_sources() scan; the
+        chunk count is the exact index total, since the scan is capped at
+        PINECONE_MAX_QUERY_RESULTS.
+
+        Returns:
+            Dict with total_sources and total_chunks
+        """
+        sources = self.get_all_sources(user_id=user_id)
+        return {
+            "total_sources": len(sources),
+            "total_chunks": self.count(),
+        }
+
     def get_chunks_by_source(self, source_name: str, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get all chunks for a specific source.
@@ -0,0 +1,104 @@
+"""Coalesce vector writes from concurrent uploads into shared batches."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend.config import VECTOR_WRITE_BATCH_SIZE, VECTOR_WRITE_MAX_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class VectorWriteBatcher:
+    """
+    Queue add_documents calls and flush them to the vector store together.
+
+    Each caller still awaits its own document IDs (or the exception), so the
+    upload endpoint behaves as before. Uploads that arrive within
+    VECTOR_WRITE_MAX_WAIT of each other share one embedding pass and one run
+    of Pinecone upserts, up to VECTOR_WRITE_BATCH_SIZE chunks per flush.
+
+    Flushes run on the batcher's own thread rather than the default executor,
+    so a long embed + upsert pass never holds up the to_thread calls that
+    queries depend on.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        max_chunks: int = VECTOR_WRITE_BATCH_SIZE,
+        max_wait: float = VECTOR_WRITE_MAX_WAIT,
+    ):
+        self.vector_store = vector_store
+        self.max_chunks = max_chunks
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # The flush loop is serial, so one thread is all it ever uses
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-write")
+
+    async def add_documents(self, documents: List[Dict[str, Any]], user_id: Optional[str] = None) -> List[str]:
+        """Queue documents for the next flush and wait for their IDs."""
+        if not documents:
+            return []
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((documents, user_id, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[List[Dict[str, Any]], Optional[str], asyncio.Future]]:
+        """Wait for one request, then collect more until the size or time budget runs out."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        total = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+
+        while total < self.max_chunks:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            total += len(item[0])
+
+        return batch
+
+    async def _run(self) -> None:
+        """Background loop: drain the queue and write each batch in a worker thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                id_groups = await loop.run_in_executor(
+                    self._executor,
+                    self.vector_store.add_document_batches,
+                    [(documents, user_id) for documents, user_id, _ in batch],
+                )
+            except Exception as e:
+                logger.exception("Vector write failed for a batch of %d upload(s)", len(batch))
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), ids in zip(batch, id_groups):
+                if not future.done():
+                    future.set_result(ids)
+
+    async def close(self) -> None:
+        """Stop the background flush loop and its thread. Called at app shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
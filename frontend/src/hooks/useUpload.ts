@@ -1,6 +1,6 @@
 "use client";
 
-import { useRef, useCallback } from "react";
+import { useRef, useCallback, useEffect } from "react";
 import { useApi } from "./useApi";
 import type { Toast } from "@/types/chat";
 
@@ -15,11 +15,40 @@ interface UploadOptions {
   onSuccess?: () => void;
 }
 
+interface UploadJob {
+  job_id: number;
+  status: "queued" | "processing" | "done" | "failed";
+  detail?: string | null;
+}
+
+// Job polling backs off from 1s to 10s and gives up after ~10 minutes
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_MAX_INTERVAL_MS = 10000;
+const JOB_POLL_BACKOFF = 1.5;
+const JOB_POLL_MAX_ATTEMPTS = 70;
+
 export function useUpload(toastHandlers: ToastHandlers) {
-  const { createXhr } = useApi();
+  const { apiFetch, createXhr } = useApi();
   const handlersRef = useRef(toastHandlers);
   handlersRef.current = toastHandlers;
   const processingIntervalRef = useRef<NodeJS.Timeout | null>(null);
+  const pollTimersRef = useRef<Set<NodeJS.Timeout>>(new Set());
+  const isMountedRef = useRef(true);
+
+  useEffect(() => {
+    isMountedRef.current = true;
+    const pollTimers = pollTimersRef.current;
+
+    return () => {
+      isMountedRef.current = false;
+      pollTimers.forEach((timer) => clearTimeout(timer));
+      pollTimers.clear();
+      if (processingIntervalRef.current) {
+        clearInterval(processingIntervalRef.current);
+        processingIntervalRef.current = null;
+      }
+    };
+  }, []);
 
   const uploadFile = useCallback(
     (file: File, options: UploadOptions = {}) => {
@@ -62,56 +91,88 @@ export function useUpload(toastHandlers: ToastHandlers) {
         }
       });
 
-      xhr.addEventListener("load", () => {
+      const stopProcessing = () => {
         if (processingIntervalRef.current) {
           clearInterval(processingIntervalRef.current);
           processingIntervalRef.current = null;
         }
+      };
+
+      const succeed = () => {
+        stopProcessing();
+        removeToast(toastId);
+        addToast({
+          type: "success",
+          message: "Upload complete",
+          subMessage: "Document added to knowledge base",
+        });
+        options.onSuccess?.();
+      };
 
+      const fail = (detail: string) => {
+        stopProcessing();
+        removeToast(toastId);
+        addToast({
+          type: "error",
+          message: "Upload failed",
+          subMessage: detail,
+        });
+      };
+
+      // 202: the server queued the file; poll its job until indexing finishes.
+      // Stops on a terminal status or error response (e.g. 404), after
+      // JOB_POLL_MAX_ATTEMPTS, or when the component unmounts.
+      const pollJob = async (jobId: number, attempt = 0) => {
+        try {
+          const res = await apiFetch(`/api/jobs/${jobId}`);
+          const job: UploadJob = await res.json();
+          if (!isMountedRef.current) return;
+          if (!res.ok) {
+            fail(job.detail || "Unknown error");
+          } else if (job.status === "done") {
+            succeed();
+          } else if (job.status === "failed") {
+            fail(job.detail || "Unknown error");
+          } else if (attempt + 1 >= JOB_POLL_MAX_ATTEMPTS) {
+            fail("Still processing; refresh later to see the document");
+          } else {
+            const delay = Math.min(
+              JOB_POLL_INTERVAL_MS * JOB_POLL_BACKOFF ** attempt,
+              JOB_POLL_MAX_INTERVAL_MS
+            );
+            const timer = setTimeout(() => {
+              pollTimersRef.current.delete(timer);
+              pollJob(jobId, attempt + 1);
+            }, delay);
+            pollTimersRef.current.add(timer);
+          }
+        } catch {
+          if (isMountedRef.current) fail("Could not connect to server");
+        }
+      };
+
+      xhr.addEventListener("load", () => {
         try {
           const data = JSON.parse(xhr.responseText);
-          if (xhr.status >= 200 && xhr.status < 300) {
-            removeToast(toastId);
-            addToast({
-              type: "success",
-              message: "Upload complete",
-              subMessage: "Document added to knowledge base",
-            });
-            options.onSuccess?.();
+          if (xhr.status === 202) {
+            pollJob(data.job_id);
+          } else if (xhr.status >= 200 && xhr.status < 300) {
+            succeed();
           } else {
-            removeToast(toastId);
-            addToast({
-              type: "error",
-              message: "Upload failed",
-              subMessage: data.detail || "Unknown error",
-            });
+            fail(data.detail || "Unknown error");
           }
         } catch {
-          removeToast(toastId);
-          addToast({
-            type: "error",
-            message: "Upload failed",
-            subMessage: "Invalid response",
-          });
+          fail("Invalid response");
         }
       });
 
       xhr.addEventListener("error", () => {
-        if (processingIntervalRef.current) {
-          clearInterval(processingIntervalRef.current);
-          processingIntervalRef.current = null;
-        }
-        removeToast(toastId);
-        addToast({
-          type: "error",
-          message: "Upload failed",
-          subMessage: "Could not connect to server",
-        });
+        fail("Could not connect to server");
       });
 
       xhr.send(formData);
     },
-    [createXhr]
+    [apiFetch, createXhr]
   );
 
   return { uploadFile };